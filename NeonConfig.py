@@ -1,27 +1,46 @@
-from qfluentwidgets import qconfig, QConfig, ConfigItem, OptionsConfigItem, BoolValidator, OptionsValidator, \
-    FolderValidator, RangeConfigItem, RangeValidator, EnumSerializer, ConfigValidator
+# -*- coding: utf-8 -*-
+"""
+Config entry point
 
-class Config(QConfig):
-    AutoRun = ConfigItem("MainWindow", "AutoRun", True, BoolValidator())
+Reading a single value with `readValue` needs neither Qt nor qfluentwidgets, so the start-up decision can be made
+before anything heavy is imported. `cfg`, `Config` and `ConfigWatcher` are defined in NeonQConfig and loaded on
+first access.
+"""
 
-    Event = ConfigItem("Countdown", "Event", "", ConfigValidator())
-    Date = ConfigItem("Countdown", "Date", "", ConfigValidator())
+import json
 
-    FontFamily = ConfigItem("Curriculum", "FontFamily", "Segoe UI", ConfigValidator())
-    FontColor = ConfigItem("Curriculum", "FontColor", "#0179D4", ConfigValidator())
-    FontSizeBig = ConfigItem("Curriculum", "FontSizeBig", 24, ConfigValidator())
-    FontSizeSmall = ConfigItem("Curriculum", "FontSizeSmall", 14, ConfigValidator())
+YEAR = "2025"
+VERSION = "1.4.0"
+CONFIG_FILE = "config/config.json"
 
-    Mon = ConfigItem("Curriculum", "Mon", [], ConfigValidator())
-    Tue = ConfigItem("Curriculum", "Tue", [], ConfigValidator())
-    Wed = ConfigItem("Curriculum", "Wed", [], ConfigValidator())
-    Thu = ConfigItem("Curriculum", "Thu", [], ConfigValidator())
-    Fri = ConfigItem("Curriculum", "Fri", [], ConfigValidator())
-    Sat = ConfigItem("Curriculum", "Sat", [], ConfigValidator())
-    Sun = ConfigItem("Curriculum", "Sun", [], ConfigValidator())
+_LAZY = ("cfg", "Config", "ConfigWatcher")
 
 
-YEAR = "2025"
-VERSION = "1.4.0"
-cfg = Config()
-qconfig.load("config/config.json", cfg)
+def readConfig(path: str = CONFIG_FILE) -> dict:
+    """ raw content of the config file, empty when it is missing or invalid """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except:
+        return {}
+
+    return data if isinstance(data, dict) else {}
+
+
+def readValue(group: str, name: str, default=None, path: str = CONFIG_FILE):
+    """ value of one config item read straight from the file """
+    section = readConfig(path).get(group)
+    return section.get(name, default) if isinstance(section, dict) else default
+
+
+def isAutoRun(path: str = CONFIG_FILE) -> bool:
+    value = readValue("MainWindow", "AutoRun", True, path)
+    return value if isinstance(value, bool) else True
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import NeonQConfig
+        return getattr(NeonQConfig, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,761 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import heapq
+import bisect
+import random
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from PyQt5.QtCore import QThread, pyqtSignal
+
+API_HOST = "http://10.181.201.165:1908"
+CACHE_DIR = "cache"
+
+logger = logging.getLogger("Neon.fetch")
+
+
+class ResponseCache:
+    """ On-disk cache of the last good payload of every source
+
+    Entries older than the source ttl are revalidated with If-None-Match / If-Modified-Since,
+    entries older than the source maxStale are dropped and never painted.
+    """
+
+    def __init__(self, folder: str = CACHE_DIR, maxEntries: int = 16, maxBytes: int = 1024 * 1024):
+        self.folder = folder
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _path(self, name: str):
+        return os.path.join(self.folder, f"{name}.json")
+
+    def _load(self):
+        if not os.path.isdir(self.folder):
+            return
+
+        for fileName in os.listdir(self.folder):
+            if not fileName.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.folder, fileName), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                entry["size"] = os.path.getsize(os.path.join(self.folder, fileName))
+                self._entries[fileName[:-5]] = entry
+            except:
+                pass
+
+        self._evict()
+
+    def get(self, name: str, maxStale: float = None):
+        """ get the cached entry of a source, or None if missing or older than `maxStale` seconds """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            if maxStale is not None and self.age(entry) > maxStale:
+                self._remove(name)
+                return None
+            return entry
+
+    def age(self, entry: dict) -> float:
+        return max(0.0, time.time() - entry["timestamp"])
+
+    def put(self, name: str, data, etag: str = None, lastModified: str = None):
+        """ store a fresh payload of a source """
+        entry = {"timestamp": time.time(), "etag": etag, "lastModified": lastModified, "data": data}
+        content = json.dumps(entry, ensure_ascii=False)
+        entry["size"] = len(content.encode('utf-8'))
+        if entry["size"] > self.maxBytes:
+            return
+
+        with self._lock:
+            self._entries[name] = entry
+            self._write(name, content)
+            self._evict()
+
+    def remove(self, name: str):
+        """ drop the cached payload of a source, e.g. when it no longer parses """
+        with self._lock:
+            self._remove(name)
+
+    def touch(self, name: str):
+        """ mark the cached payload of a source as revalidated """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return
+            entry["timestamp"] = time.time()
+            self._write(name, json.dumps({k: v for k, v in entry.items() if k != "size"}, ensure_ascii=False))
+
+    def _write(self, name: str, content: str):
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            tmpPath = self._path(name) + ".tmp"
+            with open(tmpPath, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmpPath, self._path(name))
+        except:
+            pass
+
+    def _remove(self, name: str):
+        self._entries.pop(name, None)
+        try:
+            os.remove(self._path(name))
+        except:
+            pass
+
+    def _evict(self):
+        names = sorted(self._entries, key=lambda n: self._entries[n]["timestamp"])
+        total = sum(entry["size"] for entry in self._entries.values())
+        while names and (len(names) > self.maxEntries or total > self.maxBytes):
+            name = names.pop(0)
+            total -= self._entries[name]["size"]
+            self._remove(name)
+
+
+class FetchCancelled(Exception):
+    """ Raised inside a fetch when the worker is asked to stop """
+    pass
+
+
+class FetchError(Exception):
+    """ Classified failure of a fetch """
+
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    HTTP = "http"
+    DECODE = "decode"
+
+    def __init__(self, kind: str, message: str = ""):
+        super().__init__(message or kind)
+        self.kind = kind
+
+    @classmethod
+    def fromException(cls, e: Exception):
+        import requests
+
+        if isinstance(e, FetchError):
+            return e
+        if isinstance(e, requests.Timeout):
+            return cls(cls.TIMEOUT, str(e))
+        if isinstance(e, requests.HTTPError):
+            return cls(cls.HTTP, str(e))
+        if isinstance(e, (ValueError, KeyError, TypeError)):
+            return cls(cls.DECODE, str(e))
+        return cls(cls.CONNECTION, str(e))
+
+
+class RetryPolicy:
+    """ Exponential backoff with full jitter between failed fetches """
+
+    def __init__(self, base: float = 15, factor: float = 2, maximum: float = 30 * 60):
+        self.base = base
+        self.factor = factor
+        self.maximum = maximum
+        self.attempts = 0
+
+    def nextDelay(self) -> float:
+        """ delay before the next retry, grows with every consecutive failure """
+        delay = min(self.maximum, self.base * self.factor ** self.attempts)
+        self.attempts += 1
+        return random.uniform(self.base / 2, delay)
+
+    def reset(self):
+        self.attempts = 0
+
+    @staticmethod
+    def jitter(interval: float, ratio: float = 0.1) -> float:
+        """ spread a regular interval so clients do not poll in lockstep """
+        return interval * random.uniform(1 - ratio, 1 + ratio)
+
+
+class CircuitBreaker:
+    """ Stops requests to a failing endpoint and lets one probe through after a cooldown """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, threshold: int = 3, cooldown: float = 5 * 60, maxCooldown: float = 60 * 60):
+        self.threshold = threshold
+        self.baseCooldown = cooldown
+        self.maxCooldown = maxCooldown
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.openedAt = 0.0
+
+    def allowRequest(self) -> bool:
+        if self.state == self.OPEN and self.remaining() <= 0:
+            self.state = self.HALF_OPEN
+        return self.state != self.OPEN
+
+    def remaining(self) -> float:
+        """ seconds left before the half-open probe """
+        return max(0.0, self.openedAt + self.cooldown - time.monotonic())
+
+    def probeNow(self):
+        """ let the next request through as a half-open probe """
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+
+    def recordSuccess(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = self.baseCooldown
+
+    def recordFailure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self.cooldown = min(self.maxCooldown, self.cooldown * 2)
+            self._open()
+        elif self.failures >= self.threshold:
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.openedAt = time.monotonic()
+        self.cooldown = RetryPolicy.jitter(self.cooldown)
+
+
+@dataclass(frozen=True)
+class WeatherSnapshot:
+    """ Validated realtime weather handed from the fetch worker to the UI """
+
+    __slots__ = ("temperature", "skycon", "keypoint", "timestamp", "forecastTimes", "forecast")
+
+    temperature: float
+    skycon: str
+    keypoint: str
+    timestamp: float
+    forecastTimes: tuple
+    forecast: tuple
+
+    @classmethod
+    def parse(cls, data: dict, timestamp: float = None):
+        """ `timestamp` is when the payload was fetched, now by default """
+        result = data['result']
+        realtime = result['realtime']
+        times, forecast = cls._parseHourly(result.get('hourly'))
+        return cls(
+            float(realtime['temperature']),
+            str(realtime['skycon']),
+            str(result['forecast_keypoint']),
+            time.time() if timestamp is None else timestamp,
+            times,
+            forecast
+        )
+
+    @staticmethod
+    def _parseHourly(hourly):
+        """ hourly forecast points, malformed ones are skipped and a malformed block gives no forecast """
+        try:
+            skycons = {item['datetime']: str(item['value']) for item in hourly.get('skycon') or []
+                       if isinstance(item, dict) and 'datetime' in item and 'value' in item}
+            items = list(hourly.get('temperature') or [])
+        except (AttributeError, TypeError):
+            return (), ()
+
+        points = []
+        for item in items:
+            try:
+                timestamp = datetime.fromisoformat(item['datetime']).timestamp()
+                points.append((timestamp, float(item['value']), skycons.get(item['datetime'], "")))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        points.sort()
+        return tuple(p[0] for p in points), tuple((p[1], p[2]) for p in points)
+
+    def temperatureAt(self, timestamp: float):
+        """ forecast temperature interpolated between hourly points, None outside the forecast window """
+        times = self.forecastTimes
+        if not times or not times[0] <= timestamp <= times[-1]:
+            return None
+
+        i = bisect.bisect_right(times, timestamp)
+        if i >= len(times):
+            return self.forecast[-1][0]
+
+        t0, t1 = times[i - 1], times[i]
+        v0, v1 = self.forecast[i - 1][0], self.forecast[i][0]
+        return v0 + (v1 - v0) * (timestamp - t0) / (t1 - t0)
+
+    def skyconAt(self, timestamp: float):
+        """ forecast skycon of the hour containing `timestamp`, None outside the forecast window """
+        times = self.forecastTimes
+        if not times or not times[0] <= timestamp <= times[-1]:
+            return None
+
+        return self.forecast[bisect.bisect_right(times, timestamp) - 1][1] or None
+
+
+@dataclass(frozen=True)
+class MottoSnapshot:
+    """ Validated sentence of the day handed from the fetch worker to the UI """
+
+    __slots__ = ("chs", "eng", "timestamp")
+
+    chs: str
+    eng: str
+    timestamp: float
+
+    @classmethod
+    def parse(cls, data: dict, timestamp: float = None):
+        if not isinstance(data['chs'], str) or not isinstance(data['eng'], str):
+            raise ValueError("malformed sentence")
+        return cls(data['chs'], data['eng'], time.time() if timestamp is None else timestamp)
+
+
+def secondsUntilMidnight() -> float:
+    """ seconds left until the next local midnight """
+    now = datetime.now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class Endpoint:
+    """ API mirror with an EWMA of its response latency """
+
+    def __init__(self, url: str, alpha: float = 0.3):
+        self.url = url.rstrip("/")
+        self.alpha = alpha
+        self.latency = None
+        self.isHealthy = True
+        self.failures = 0
+
+    def recordSuccess(self, latency: float):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = self.alpha * latency + (1 - self.alpha) * self.latency
+        self.isHealthy = True
+        self.failures = 0
+
+    def recordFailure(self):
+        self.failures += 1
+        self.isHealthy = False
+
+
+class EndpointPool:
+    """ Ordered list of API mirrors routed by health and latency """
+
+    def __init__(self, urls=None):
+        self.endpoints = []
+        self._lock = threading.Lock()
+        self.setUrls(urls or [API_HOST])
+
+    def setUrls(self, urls):
+        """ replace the mirror list, keeping the statistics of mirrors that remain """
+        if isinstance(urls, str):
+            urls = [urls]
+
+        with self._lock:
+            known = {endpoint.url: endpoint for endpoint in self.endpoints}
+            endpoints = []
+            for url in urls:
+                url = str(url).rstrip("/")
+                if url and url not in (e.url for e in endpoints):
+                    endpoints.append(known.get(url) or Endpoint(url))
+            self.endpoints = endpoints or [Endpoint(API_HOST)]
+
+    def ordered(self):
+        """ healthy mirrors from fastest to slowest with unmeasured ones first, then unhealthy ones """
+        with self._lock:
+            endpoints = list(enumerate(self.endpoints))
+
+        def key(item):
+            index, endpoint = item
+            return not endpoint.isHealthy, endpoint.latency if endpoint.latency is not None else 0.0, index
+
+        return [endpoint for _, endpoint in sorted(endpoints, key=key)]
+
+    def probe(self, session, timeout: float = 2, isRunning=None):
+        """ check every mirror with a lightweight request, any HTTP answer counts as healthy
+
+        `isRunning` is checked before every mirror so a stop request costs at most one probe.
+        """
+        for endpoint in self.ordered():
+            if isRunning is not None and not isRunning():
+                return
+
+            start = time.perf_counter()
+            try:
+                session.head(endpoint.url + "/", timeout=timeout).close()
+                endpoint.recordSuccess(time.perf_counter() - start)
+            except:
+                # a probe aborted by FetchThread.stop says nothing about the mirror
+                if isRunning is not None and not isRunning():
+                    return
+                endpoint.recordFailure()
+
+    def __len__(self):
+        return len(self.endpoints)
+
+
+class FetchSource:
+    """ Periodic data source polled by FetchThread
+
+    `ttl` is how long a cached payload is served without a request,
+    `maxStale` is how long it may still be painted while the server is unreachable.
+    A `daily` source changes once per day, is fetched right after local midnight and
+    a payload fetched today stays fresh until then.
+    """
+
+    def __init__(self, name: str, path: str, interval: float, parser, ttl: float = None,
+                 maxStale: float = 24 * 60 * 60, daily: bool = False):
+        self.name = name
+        self.path = path
+        self.parser = parser
+        self.interval = interval
+        self.ttl = interval if ttl is None else ttl
+        self.maxStale = maxStale
+        self.daily = daily
+        self.data = {}
+        self.snapshot = None
+        self.latency = 0.0
+        self.startedAt = 0.0
+        self.emittedAt = 0.0
+        self.lastError = None
+        self.retry = RetryPolicy(maximum=min(interval, 30 * 60))
+        self.breaker = CircuitBreaker()
+
+    def url(self, endpoint: Endpoint):
+        return endpoint.url + self.path
+
+    def nextDelay(self) -> float:
+        """ delay before the next regular fetch """
+        if self.daily:
+            return secondsUntilMidnight() + random.uniform(0, 60)
+        return RetryPolicy.jitter(self.interval)
+
+    def setSnapshot(self, snapshot):
+        self.snapshot = snapshot
+
+    def freshFor(self, timestamp: float) -> float:
+        """ seconds a payload fetched at `timestamp` is still served without a request """
+        if self.daily:
+            if datetime.fromtimestamp(timestamp).date() != datetime.now().date():
+                return 0.0
+            return self.nextDelay()
+        return self.ttl - max(0.0, time.time() - timestamp)
+
+
+class ForecastSource(FetchSource):
+    """ Weather source polled rarely while its hourly forecast keeps matching the observations
+
+    Falls back to `resyncInterval` whenever an observation diverges from the forecast of the
+    previous payload by more than `threshold` degrees.
+    """
+
+    def __init__(self, name: str, path: str, interval: float, parser, resyncInterval: float,
+                 threshold: float, **kwargs):
+        super().__init__(name, path, interval, parser, **kwargs)
+        self.resyncInterval = resyncInterval
+        self.threshold = threshold
+        self.isDiverged = True
+
+    def setSnapshot(self, snapshot):
+        if self.snapshot is not None:
+            expected = self.snapshot.temperatureAt(snapshot.timestamp)
+            self.isDiverged = expected is None or abs(expected - snapshot.temperature) > self.threshold
+        super().setSnapshot(snapshot)
+
+    def nextDelay(self) -> float:
+        if self.isDiverged or self.snapshot is None or not self.snapshot.forecast:
+            return RetryPolicy.jitter(self.resyncInterval)
+        return super().nextDelay()
+
+
+# threads that outlived FetchThread.stop, referenced until they finish so Qt never destroys them while running
+_stopping = set()
+
+
+class FetchThread(QThread):
+    """ Single worker running every periodic source on one thread with a shared session """
+
+    weather_updated = pyqtSignal(object)
+    weather_error = pyqtSignal(str)
+    motto_updated = pyqtSignal(object)
+    motto_error = pyqtSignal(str)
+    latency_measured = pyqtSignal(str, float)
+
+    PROBE = "__probe__"
+
+    def __init__(self, endpoints=None, probeInterval: float = 10 * 60, forecastInterval: float = None,
+                 resyncThreshold: float = 2.0, parent=None):
+        super().__init__(parent=parent)
+        self.isThreadRunning = True
+        self.sources = {}
+        self.session = None
+        self.endpoints = EndpointPool(endpoints)
+        self.probeInterval = probeInterval
+        self.cache = ResponseCache()
+        self.shutdownTime = 0.0
+        self._stopRequested = None
+        self._response = None
+        self._responseLock = threading.Lock()
+        self._queue = []
+        self._condition = threading.Condition()
+
+        if forecastInterval:
+            self.addSource(ForecastSource("weather", "/api/weather", forecastInterval, WeatherSnapshot.parse, 5 * 60,
+                                          resyncThreshold, maxStale=6 * 60 * 60))
+        else:
+            self.addSource(FetchSource("weather", "/api/weather", 5 * 60, WeatherSnapshot.parse, maxStale=6 * 60 * 60))
+        self.addSource(FetchSource("motto", "/api/pdb/sentence/today", 24 * 60 * 60, MottoSnapshot.parse, daily=True))
+        self._scheduleName(self.PROBE, 0)
+
+    def addSource(self, source: FetchSource):
+        """ register a source and schedule its first fetch immediately """
+        with self._condition:
+            self.sources[source.name] = source
+            heapq.heappush(self._queue, (time.monotonic(), source.name))
+            self._condition.notify()
+
+    def fetchNow(self, name: str = None):
+        """ wake the worker and fetch a source, or every source, right away """
+        with self._condition:
+            names = [name] if name else list(self.sources)
+            self._queue = [(due, n) for due, n in self._queue if n not in names]
+            now = time.monotonic()
+            for n in names:
+                self.sources[n].breaker.probeNow()
+                self._queue.append((now, n))
+            heapq.heapify(self._queue)
+            self._condition.notify_all()
+
+    def setEndpoints(self, urls):
+        """ replace the mirror list and probe it right away """
+        self.endpoints.setUrls(urls)
+        with self._condition:
+            self._queue = [(due, n) for due, n in self._queue if n != self.PROBE]
+            heapq.heapify(self._queue)
+        self._scheduleName(self.PROBE, 0)
+
+    def stop(self, timeout: int = 6000) -> float:
+        """ stop the worker, aborting the transfer in flight, and return the time spent in ms
+
+        With a `timeout` of 0 it returns at once and `finished` tells when the worker is done. A worker still running
+        when it returns is kept alive until it finishes, and `shutdownTime` is set to the time from the stop request
+        to the end of `run` either way; the request timeouts bound it, the thread is never terminated.
+        """
+        start = self._stopRequested = time.perf_counter()
+        with self._condition:
+            self.isThreadRunning = False
+            self._condition.notify_all()
+
+        self._abort()
+        if timeout and not self.wait(timeout):
+            logger.warning("fetch thread still running %d ms after stop", timeout)
+        if self.isRunning():
+            _stopping.add(self)
+            self.finished.connect(lambda: _stopping.discard(self))
+
+        return (time.perf_counter() - start) * 1000
+
+    def _abort(self):
+        """ close the streamed response and the pooled connections so a blocked read returns at once """
+        with self._responseLock:
+            response = self._response
+        try:
+            if response is not None:
+                response.close()
+            if self.session is not None:
+                self.session.close()
+        except:
+            pass
+
+    def latency(self, name: str) -> float:
+        """ latency of the last fetch of a source in seconds """
+        return self.sources[name].latency
+
+    def run(self):
+        self._loadCache()
+
+        # imported on the worker so the GUI thread never pays for requests and urllib3
+        import requests
+        self.session = requests.Session()
+        try:
+            while self.isThreadRunning:
+                name = self._nextDue()
+                if name == self.PROBE:
+                    self._probe()
+                elif name is not None:
+                    self._fetch(self.sources[name])
+        finally:
+            self.session.close()
+            if self._stopRequested is not None:
+                self.shutdownTime = (time.perf_counter() - self._stopRequested) * 1000
+
+    def _nextDue(self):
+        with self._condition:
+            while self.isThreadRunning:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+
+                due, name = self._queue[0]
+                delay = due - time.monotonic()
+                if delay <= 0:
+                    heapq.heappop(self._queue)
+                    return name
+
+                self._condition.wait(delay)
+
+        return None
+
+    def _loadCache(self):
+        """ paint cached payloads right away and postpone requests for the ones still fresh """
+        for source in list(self.sources.values()):
+            entry = self.cache.get(source.name, source.maxStale)
+            if entry is None:
+                continue
+
+            try:
+                # stamped with the time it was fetched, not loaded, so forecast comparisons use the real age
+                source.setSnapshot(source.parser(entry["data"], entry["timestamp"]))
+            except:
+                continue
+
+            source.data = entry["data"]
+            source.emittedAt = time.perf_counter()
+            getattr(self, f"{source.name}_updated").emit(source.snapshot)
+
+            freshFor = source.freshFor(entry["timestamp"])
+            if freshFor > 0:
+                with self._condition:
+                    self._queue = [(due, name) for due, name in self._queue if name != source.name]
+                    heapq.heapify(self._queue)
+                    heapq.heappush(self._queue, (time.monotonic() + freshFor, source.name))
+
+    def _request(self, source: FetchSource):
+        headers = {}
+        entry = self.cache.get(source.name, source.maxStale)
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("lastModified"):
+                headers["If-Modified-Since"] = entry["lastModified"]
+
+        error = None
+        for endpoint in self.endpoints.ordered():
+            start = time.perf_counter()
+            try:
+                result = self._requestEndpoint(source, endpoint, headers, entry)
+            except FetchCancelled:
+                raise
+            except Exception as e:
+                if not self.isThreadRunning:
+                    raise FetchCancelled
+                endpoint.recordFailure()
+                error = e
+                continue
+
+            endpoint.recordSuccess(time.perf_counter() - start)
+            return result
+
+        raise error
+
+    def _requestEndpoint(self, source: FetchSource, endpoint: Endpoint, headers: dict, entry: dict):
+        """ payload and its (etag, lastModified) validators, None validators when the cached payload was not modified
+
+        Nothing is cached here, the caller stores the payload only once the parser has accepted it.
+        """
+        response = self.session.get(source.url(endpoint), headers=headers, timeout=(3, 5), stream=True)
+        with self._responseLock:
+            self._response = response
+        try:
+            if not self.isThreadRunning:
+                raise FetchCancelled
+
+            if response.status_code == 304 and entry is not None:
+                return entry["data"], None
+
+            response.raise_for_status()
+            body = self._readBody(response)
+        finally:
+            with self._responseLock:
+                self._response = None
+            response.close()
+
+        return json.loads(body), (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    def _probe(self):
+        if len(self.endpoints) > 1:
+            self.endpoints.probe(self.session, isRunning=lambda: self.isThreadRunning)
+        self._scheduleName(self.PROBE, RetryPolicy.jitter(self.probeInterval))
+
+    def _readBody(self, response) -> bytes:
+        """ read the body chunk by chunk so a stop request interrupts slow transfers """
+        chunks = []
+        for chunk in response.iter_content(16 * 1024):
+            if not self.isThreadRunning:
+                raise FetchCancelled
+            chunks.append(chunk)
+
+        return b"".join(chunks)
+
+    def _schedule(self, source: FetchSource, delay: float):
+        self._scheduleName(source.name, delay)
+
+    def _scheduleName(self, name: str, delay: float):
+        with self._condition:
+            if any(n == name for _, n in self._queue):
+                return
+            heapq.heappush(self._queue, (time.monotonic() + delay, name))
+            self._condition.notify()
+
+    def _fetch(self, source: FetchSource):
+        if not source.breaker.allowRequest():
+            self._schedule(source, source.breaker.remaining())
+            return
+
+        start = source.startedAt = time.perf_counter()
+        try:
+            data, validators = self._request(source)
+            try:
+                snapshot = source.parser(data)
+            except:
+                # a cached payload that no longer parses would be revalidated by its etag forever
+                if validators is None:
+                    self.cache.remove(source.name)
+                raise
+
+            if validators is None:
+                self.cache.touch(source.name)
+            else:
+                self.cache.put(source.name, data, *validators)
+            source.setSnapshot(snapshot)
+            source.data = data
+            source.lastError = None
+        except FetchCancelled:
+            return
+        except Exception as e:
+            if not self.isThreadRunning:
+                return
+            source.lastError = FetchError.fromException(e)
+
+        source.latency = time.perf_counter() - start
+        self.latency_measured.emit(source.name, source.latency)
+
+        if source.lastError is None:
+            source.breaker.recordSuccess()
+            source.retry.reset()
+            self._schedule(source, source.nextDelay())
+            source.emittedAt = time.perf_counter()
+            getattr(self, f"{source.name}_updated").emit(source.snapshot)
+        else:
+            source.breaker.recordFailure()
+            if source.breaker.state == CircuitBreaker.OPEN:
+                self._schedule(source, source.breaker.remaining())
+            else:
+                self._schedule(source, source.retry.nextDelay())
+            getattr(self, f"{source.name}_error").emit(source.lastError.kind)
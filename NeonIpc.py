@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import getpass
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+COMMANDS = ("show", "refresh", "restart")
+PING = "ping"
+
+
+def serverName() -> str:
+    """ name of the local socket, one per user so that sessions on the same machine do not collide """
+    return f"Neon-{getpass.getuser()}"
+
+
+def sendCommand(command: str, timeout: int = 500, name: str = None):
+    """ send a command to the running instance and return its reply, None when no instance answers
+
+    Uses the blocking socket API, so neither a QApplication nor an event loop is needed.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name or serverName())
+    if not socket.waitForConnected(timeout):
+        return None
+
+    socket.write(f"{command}\n".encode("utf-8"))
+    socket.waitForBytesWritten(timeout)
+    reply = None
+    while socket.waitForReadyRead(timeout) or socket.bytesAvailable():
+        if socket.canReadLine():
+            reply = bytes(socket.readLine()).decode("utf-8").strip()
+            break
+
+    socket.disconnectFromServer()
+    return reply
+
+
+class IpcServer(QObject):
+    """ Local socket the running instance listens on for newline-terminated commands """
+
+    commandReceived = pyqtSignal(str)
+
+    def __init__(self, name: str = None, parent=None):
+        super().__init__(parent=parent)
+        self.name = name or serverName()
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._onNewConnection)
+
+    def listen(self) -> bool:
+        """ start listening, only call this while holding the single-instance lock """
+        if self.server.listen(self.name):
+            return True
+
+        # the socket file of a crashed instance is left behind on unix
+        QLocalServer.removeServer(self.name)
+        return self.server.listen(self.name)
+
+    def close(self):
+        self.server.close()
+
+    def _onNewConnection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self._onReadyRead(s))
+            socket.disconnected.connect(socket.deleteLater)
+            if socket.bytesAvailable():
+                self._onReadyRead(socket)
+
+    def _onReadyRead(self, socket: QLocalSocket):
+        while socket.canReadLine():
+            command = bytes(socket.readLine()).decode("utf-8", "replace").strip()
+            if command == PING:
+                socket.write(b"ok\n")
+            elif command in COMMANDS:
+                socket.write(b"ok\n")
+                self.commandReceived.emit(command)
+            else:
+                socket.write(b"unknown\n")
+            socket.flush()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2 or sys.argv[1] not in COMMANDS + (PING,):
+        sys.exit(f"usage: NeonIpc.py {{{'|'.join(COMMANDS + (PING,))}}}")
+
+    reply = sendCommand(sys.argv[1])
+    print(reply or "Neon is not running")
+    sys.exit(0 if reply == "ok" else 1)
@@ -1,9 +1,33 @@
 # -*- coding: utf-8 -*-
 
+import os
 import sys
 import subprocess
+from NeonIpc import sendCommand, PING
+from NeonLock import holderPid
+
+
+def isRunning() -> bool:
+    """ whether a NeonMain of this user answers on its local socket """
+    return sendCommand(PING) is not None
+
+
+def launch():
+    if os.name == 'nt':
+        subprocess.run(["NeonMain.exe", "--force-start"], shell=True)
+    else:
+        # detached, the launcher exits right away instead of living as long as NeonMain
+        subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "NeonMain.py"),
+                          "--force-start"], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+# without a running instance there is no dialog to show, so decide before the widgets are imported
+if __name__ == '__main__' and not isRunning():
+    launch()
+    sys.exit()
+
 import darkdetect
-from psutil import process_iter, Process
 from PyQt5.QtGui import QColor
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QFrame
@@ -141,29 +165,34 @@ class App:
         self.app = QApplication(sys.argv)
         self.main_window = MainWindow()
         setThemeColor(QColor(190, 4, 17))
-        if str(subprocess.run(['tasklist'], capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW, shell=True)).find("NeonMain.exe") != -1:
+        if isRunning():
             self.showDialog()
         else:
-            subprocess.run(["NeonMain.exe", "--force-start"], shell=True)
+            launch()
             sys.exit()
 
-    def killProcess(self, process_name):
-        for proc in process_iter(['pid', 'name']):
-            try:
-                if proc.info['name'].lower() == process_name.lower():
-                    pid = proc.info['pid']
-                    p = Process(pid)
-                    p.kill()
-            except:
-                pass
+    def killProcess(self):
+        """ kill the instance recorded in the single-instance lock """
+        pid = holderPid()
+        if pid is None:
+            return
+
+        from psutil import Process
+
+        try:
+            Process(pid).kill()
+        except:
+            pass
 
     def showDialog(self):
         w = Dialog("提示", "Neon 已在后台运行")
         w.yesButton.setText("重启")
         w.cancelButton.setText("取消")
         if w.exec():
-            self.killProcess("NeonMain.exe")
-            subprocess.run(["NeonMain.exe", "--force-start"], shell=True)
+            # the running instance reloads itself, killing it is only the fallback for one that stopped answering
+            if sendCommand("restart") is None:
+                self.killProcess()
+                launch()
             sys.exit()
         else:
             sys.exit()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import json
+import time
+import getpass
+import tempfile
+
+
+def runtimeDir() -> str:
+    """ per-user directory for the lock, independent of the working directory """
+    if os.name == 'nt':
+        return os.path.join(os.environ.get("LOCALAPPDATA") or tempfile.gettempdir(), "Neon")
+
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "neon")
+    return os.path.join(tempfile.gettempdir(), f"neon-{getpass.getuser()}")
+
+
+def processStartTime(pid: int):
+    """ creation time of a process, None if it does not exist """
+    import psutil
+
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.Error:
+        return None
+
+
+class InstanceLock:
+    """ Exclusive per-user lock that records the pid of its holder and the time it took the lock
+
+    The lock itself is an OS file lock, so it is released whenever the holder dies and a crashed instance never
+    blocks the next one. The holder is recorded in a separate `.pid` file because a locked file can not be read on
+    Windows; a record whose process is gone, or was created after the lock was taken and therefore reuses the pid,
+    is stale and ignored.
+
+    Only the time is recorded at acquire, the creation time of the process is looked up with psutil when the record
+    is read, so the start-up path of the holder never imports psutil.
+    """
+
+    def __init__(self, name: str = "NeonMain", directory: str = None):
+        directory = directory or runtimeDir()
+        self.path = os.path.join(directory, f"{name}.lock")
+        self.pidPath = os.path.join(directory, f"{name}.pid")
+        self.file = None
+
+    def acquire(self) -> bool:
+        """ take the lock without blocking, False if another live instance holds it """
+        import portalocker
+
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        self.file = open(self.path, 'a')
+        try:
+            portalocker.lock(self.file, portalocker.LOCK_EX | portalocker.LOCK_NB)
+        except portalocker.LockException:
+            self.file.close()
+            self.file = None
+            return False
+
+        # whatever a crashed holder left behind is overwritten here
+        record = {"pid": os.getpid(), "startTime": time.time()}
+        tmp = self.pidPath + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+        os.replace(tmp, self.pidPath)
+        return True
+
+    def release(self):
+        if not self.file:
+            return
+
+        import portalocker
+
+        try:
+            os.remove(self.pidPath)
+        except OSError:
+            pass
+        portalocker.unlock(self.file)
+        self.file.close()
+        self.file = None
+
+    def holder(self):
+        """ {"pid", "startTime"} of the live holder, None when the lock is free or the record is stale """
+        try:
+            with open(self.pidPath, encoding='utf-8') as f:
+                record = json.load(f)
+            pid, startTime = int(record["pid"]), float(record["startTime"])
+        except:
+            return None
+
+        # a process that took the lock was created before it, one second of slack for coarse creation times
+        actual = processStartTime(pid)
+        if actual is None or actual > startTime + 1:
+            return None
+        return {"pid": pid, "startTime": startTime}
+
+    def holderPid(self):
+        holder = self.holder()
+        return holder["pid"] if holder else None
+
+
+def holderPid(name: str = "NeonMain"):
+    """ pid of the running instance, None if there is none """
+    return InstanceLock(name).holderPid()
+
+
+if __name__ == '__main__':
+    pid = holderPid()
+    print(pid or "Neon is not running")
+    sys.exit(0 if pid else 1)
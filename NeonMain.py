@@ -1,23 +1,33 @@
 # -*- coding: utf-8 -*-
 
+import sys
+from NeonConfig import isAutoRun
+
+# decide before Qt is imported, a disabled auto run should cost no more than reading the config
+if __name__ == '__main__' and not ((len(sys.argv) == 2 and sys.argv[1] == '--force-start') or isAutoRun()):
+    sys.exit()
+
 import os
 import re
-import sys
 import time
-import requests
-import portalocker
+import threading
 import NeonResource
 from typing import Union
-from NeonConfig import cfg
+from collections import OrderedDict
+from NeonConfig import cfg, ConfigWatcher
+from NeonFetch import FetchThread, secondsUntilMidnight
+from NeonIpc import IpcServer, sendCommand
+from NeonLock import InstanceLock
+from NeonMetrics import metrics
+from NeonTimetable import Timetable, WEEKDAYS
 from darkdetect import isDark
-from PyQt5.QtCore import Qt, QPoint, pyqtSignal, QSize, pyqtProperty, QRect, QRectF, QEvent, QUrl, QThread, QDate, \
-    QTimer, QEasingCurve
+from PyQt5.QtCore import Qt, QPoint, QPointF, pyqtSignal, QSize, pyqtProperty, QRect, QRectF, QEvent, QUrl, QDate, \
+    QTimer, QEasingCurve, QObject, QTime, QAbstractListModel, QModelIndex, QAbstractAnimation
 from PyQt5.QtGui import QColor, QPainter, QPainterPath, QLinearGradient, QIcon, QDesktopServices, QFontMetrics, QFont, \
-    QImage, QPixmap, QImageReader, QMovie
+    QImage, QPixmap, QImageReader, QMovie, QStaticText, QTransform
 from PyQt5.QtWidgets import QApplication, QHBoxLayout, QVBoxLayout, QStackedWidget, QWidget, QGridLayout, QListWidget, \
     QListWidgetItem, QFrame, QSwipeGesture, QPushButton, QSizePolicy, QStyleOptionButton, QStyle, QLabel, QScrollArea, \
-    QScroller, QSystemTrayIcon, QAction
-from PyQt5.QtSvg import QSvgRenderer
+    QScroller, QSystemTrayIcon, QAction, QListView, QStyledItemDelegate
 from qfluentwidgets import FluentIcon, isDarkTheme, HorizontalPipsPager, drawIcon, PipsScrollButtonDisplayMode, \
     SmoothScrollBar, FluentStyleSheet, ToolTipFilter, ToolTipPosition, Theme, setFont, FluentIconBase, themeColor, \
     qconfig, setCustomStyleSheet, getFont, SmoothScrollDelegate, FluentFontIconBase, setTheme
@@ -29,20 +39,19 @@ from qfluentwidgets.common.overload import singledispatchmethod
 
 class Mutex:
     def __init__(self):
-        self.file = None
+        self.lock = InstanceLock()
 
     def __enter__(self):
-        self.file = open('RandomMain.lockfile', 'w')
-        try:
-            portalocker.lock(self.file, portalocker.LOCK_EX | portalocker.LOCK_NB)
-        except portalocker.AlreadyLocked:
+        if not self.lock.acquire():
+            sendCommand("show")
             sys.exit()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.file:
-            portalocker.unlock(self.file)
-            self.file.close()
-            os.remove('RandomMain.lockfile')
+        self.lock.release()
+
+    def holderPid(self):
+        """ pid of the instance holding the lock, None if it is free """
+        return self.lock.holderPid()
 
 
 class FluentFontIcon(FluentFontIconBase):
@@ -446,11 +455,23 @@ class ImageLabel(QLabel):
 
     clicked = pyqtSignal()
 
+    frameCacheBudget = 16 * 1024 * 1024
+
     @singledispatchmethod
     def __init__(self, parent: QWidget = None):
         super().__init__(parent)
         self.image = QImage()
         self.svgRenderer = None
+        self._scaledKey = None
+        self._scaledPixmap = QPixmap()
+        self._clipPathKey = None
+        self._clipPath = QPainterPath()
+        self._animationPath = None
+        self._frames = []
+        self._frameIndex = 0
+        self._frameTimer = QTimer(self)
+        self._frameTimer.setSingleShot(True)
+        self._frameTimer.timeout.connect(self._onFrameTimeOut)
         self.setBorderRadius(0, 0, 0, 0)
         self._postInit()
 
@@ -484,12 +505,122 @@ class ImageLabel(QLabel):
         self._bottomRightRadius = bottomRight
         self.update()
 
+    def setFrameCacheBudget(self, budget: int):
+        """ set the maximum bytes of decoded frames kept for an animation, larger ones are streamed """
+        self.frameCacheBudget = budget
+        path = self._animationPath
+        if not path:
+            return
+
+        # the decoded frames or the movie of the old budget would otherwise be picked up again
+        self._stopAnimation()
+        self._setAnimation(path)
+
+    def _setAnimation(self, path: str):
+        self._animationPath = path
+        reader = QImageReader(path)
+        self.image = reader.read()
+        if not self.image.isNull():
+            self.setFixedSize(self.image.size())
+
+        self._startAnimation()
+
+    def _stopAnimation(self):
+        self._frameTimer.stop()
+        self._animationPath = None
+        self._frames = []
+        self._frameIndex = 0
+        if self.movie():
+            self.movie().stop()
+            super().clear()
+
+    def _decodeFrames(self):
+        """ decode every frame once at the display size, None if the animation exceeds the byte budget """
+        reader = QImageReader(self._animationPath)
+        dpr = self.devicePixelRatioF()
+        size = self.size() * dpr
+        if not size.isEmpty():
+            reader.setScaledSize(size)
+
+        frames = []
+        total = 0
+        count = reader.imageCount() if reader.imageCount() > 0 else 1000
+        while len(frames) < count:
+            image = reader.read()
+            if image.isNull():
+                break
+
+            image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+            image.setDevicePixelRatio(dpr)
+            total += image.sizeInBytes()
+            if total > self.frameCacheBudget:
+                return None
+
+            frames.append((image, max(reader.nextImageDelay(), 20)))
+
+        return frames
+
+    def _startAnimation(self):
+        if not self._animationPath or not self.isVisible():
+            return
+
+        if self.movie():
+            self.movie().setPaused(False)
+            return
+
+        if not self._frames:
+            frames = self._decodeFrames()
+            if frames is None:
+                movie = QMovie(self._animationPath)
+                movie.setScaledSize(self.size() * self.devicePixelRatioF())
+                self.setMovie(movie)
+                return
+
+            self._frames = frames
+
+        if self._frames:
+            self._showFrame(self._frameIndex % len(self._frames))
+
+    def _pauseAnimation(self):
+        self._frameTimer.stop()
+        if self.movie() and self.movie().state() == QMovie.Running:
+            self.movie().setPaused(True)
+
+    def _showFrame(self, index: int):
+        self._frameIndex = index
+        self.image, delay = self._frames[index]
+        self.update()
+        if len(self._frames) > 1:
+            self._frameTimer.start(delay)
+
+    def _onFrameTimeOut(self):
+        if self._frames:
+            self._showFrame((self._frameIndex + 1) % len(self._frames))
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self._startAnimation()
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self._pauseAnimation()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        if self._frames:
+            self._frames = []
+            self._frameTimer.stop()
+            self._startAnimation()
+
     def setImage(self, image: Union[str, QPixmap, QImage] = None):
         """ set the image of label """
         self.svgRenderer = None
+        self._stopAnimation()
 
         if isinstance(image, str):
             if image.lower().endswith('.svg'):
+                from PyQt5.QtSvg import QSvgRenderer
+
                 self.svgRenderer = QSvgRenderer(image)
                 if self.svgRenderer.isValid():
                     default_size = self.svgRenderer.defaultSize()
@@ -499,22 +630,22 @@ class ImageLabel(QLabel):
                 else:
                     reader = QImageReader(image)
                     if reader.supportsAnimation():
-                        self.setMovie(QMovie(image))
+                        self._setAnimation(image)
                     else:
                         self.image = reader.read()
             else:
                 reader = QImageReader(image)
                 if reader.supportsAnimation():
-                    self.setMovie(QMovie(image))
+                    self._setAnimation(image)
                 else:
                     self.image = reader.read()
                     self.setFixedSize(self.image.size())
         elif isinstance(image, QPixmap):
             self.image = image.toImage()
-            self.setFixedSize(self.image.size())
+            self.setFixedSize(self.image.size() / self.image.devicePixelRatio())
         elif isinstance(image, QImage):
             self.image = image
-            self.setFixedSize(self.image.size())
+            self.setFixedSize(self.image.size() / self.image.devicePixelRatio())
         else:
             self.image = QImage()
 
@@ -591,12 +722,14 @@ class ImageLabel(QLabel):
         self.image = self.movie().currentImage()
         self.movie().frameChanged.connect(self._onFrameChanged)
 
-    def paintEvent(self, e):
-        painter = QPainter(self)
-        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+    def _roundedClipPath(self):
+        """ clip path rebuilt only when the size or a radius changes """
+        w, h = self.width(), self.height()
+        key = (w, h, self._topLeftRadius, self._topRightRadius, self._bottomLeftRadius, self._bottomRightRadius)
+        if key == self._clipPathKey:
+            return self._clipPath
 
         path = QPainterPath()
-        w, h = self.width(), self.height()
         path.moveTo(self._topLeftRadius, 0)
         path.lineTo(w - self._topRightRadius, 0)
         d = self._topRightRadius * 2
@@ -610,19 +743,42 @@ class ImageLabel(QLabel):
         path.lineTo(0, self._topLeftRadius)
         d = self._topLeftRadius * 2
         path.arcTo(0, 0, d, d, -180, -90)
+
+        self._clipPathKey = key
+        self._clipPath = path
+        return path
+
+    def _scaledImagePixmap(self):
+        """ image scaled to the device size, rescaled only when the image, size or DPR changes """
+        dpr = self.devicePixelRatioF()
+        key = (self.image.cacheKey(), self.width(), self.height(), dpr)
+        if key == self._scaledKey:
+            return self._scaledPixmap
+
+        size = self.size() * dpr
+        if self.image.size() == size:
+            image = QImage(self.image)
+        else:
+            image = self.image.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+        image.setDevicePixelRatio(dpr)
+        self._scaledKey = key
+        self._scaledPixmap = QPixmap.fromImage(image)
+        return self._scaledPixmap
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
         painter.setPen(Qt.NoPen)
-        painter.setClipPath(path)
 
+        if any((self._topLeftRadius, self._topRightRadius, self._bottomLeftRadius, self._bottomRightRadius)):
+            painter.setClipPath(self._roundedClipPath())
+
+        w, h = self.width(), self.height()
         if self.svgRenderer and self.svgRenderer.isValid():
             self.svgRenderer.render(painter, QRectF(0, 0, w, h))
         elif not self.image.isNull():
-            image = self.image.scaled(
-                self.size() * self.devicePixelRatioF(),
-                Qt.IgnoreAspectRatio,
-                Qt.SmoothTransformation
-            )
-            image.setDevicePixelRatio(self.devicePixelRatioF())
-            painter.drawImage(self.rect(), image)
+            painter.drawPixmap(self.rect(), self._scaledImagePixmap())
 
     @pyqtProperty(int)
     def topLeftRadius(self):
@@ -659,6 +815,9 @@ class ImageLabel(QLabel):
 
 
 class CurriculumButton(QPushButton):
+
+    _fontCache = {}
+
     @singledispatchmethod
     def __init__(self, parent: QWidget = None):
         super().__init__(parent)
@@ -669,6 +828,10 @@ class CurriculumButton(QPushButton):
         self._small_size = cfg.FontSizeSmall.value
         self._spacing = 0
         self._custom_color = None
+        self._color_cache = {}
+        self._layout_key = None
+        self._layout = None
+        self._active = False
 
         self.setStyleSheet(
             "QPushButton {font: '" + cfg.FontFamily.value + "'; padding: 6px 12px 6px 12px; color: rgb(0, 159, 170); border: none; border-radius: 6px; background-color: transparent;}"
@@ -719,20 +882,50 @@ class CurriculumButton(QPushButton):
 
         drawIcon(icon, painter, rect, state)
 
+    @classmethod
+    def textFont(cls, size: int):
+        """ shared font and metrics of the configured family """
+        key = (cfg.FontFamily.value, size)
+        if key not in cls._fontCache:
+            font = QFont(cfg.FontFamily.value, size)
+            cls._fontCache[key] = (font, QFontMetrics(font))
+        return cls._fontCache[key]
+
+    @classmethod
+    def clearFontCache(cls):
+        cls._fontCache.clear()
+
+    def invalidateTextCache(self):
+        self._layout_key = None
+        self._color_cache.clear()
+        self.update()
+
     def setDualText(self, large_text: str, small_text: str):
         self._large_text = large_text
         self._small_text = small_text
+        self._layout_key = None
         self.update()
 
     def setFontSizes(self, large_size: int, small_size: int):
         self._large_size = large_size
         self._small_size = small_size
+        self._layout_key = None
         self.update()
 
     def setTextSpacing(self, spacing: int):
         self._spacing = spacing
+        self._layout_key = None
         self.update()
 
+    def isActive(self) -> bool:
+        return self._active
+
+    def setActive(self, isActive: bool):
+        """ highlight the button as the current period """
+        if self._active != isActive:
+            self._active = isActive
+            self.update()
+
     def hasDualText(self) -> bool:
         return bool(self._large_text and self._small_text)
 
@@ -740,16 +933,14 @@ class CurriculumButton(QPushButton):
         super().setText(text)
         self._large_text = text
         self._small_text = ""
+        self._layout_key = None
         self.update()
 
     def sizeHint(self) -> QSize:
         hint = super().sizeHint()
         if self.hasDualText():
-            large_font = QFont(cfg.FontFamily.value, self._large_size)
-            small_font = QFont(cfg.FontFamily.value, self._small_size)
-
-            fm_large = QFontMetrics(large_font)
-            fm_small = QFontMetrics(small_font)
+            fm_large = self.textFont(self._large_size)[1]
+            fm_small = self.textFont(self._small_size)[1]
 
             width = fm_large.width(self._large_text) + fm_small.width(self._small_text) + self._spacing
             height = max(fm_large.height(), fm_small.height()) + 12
@@ -766,53 +957,29 @@ class CurriculumButton(QPushButton):
             self._custom_color = QColor(hex_color)
             if not self._custom_color.isValid():
                 self._custom_color = None
+            self._color_cache.clear()
             self.update()
         except:
             self._custom_color = None
 
-    def paintEvent(self, event):
-        if not self.hasDualText():
-            return super().paintEvent(event)
+    def changeEvent(self, e):
+        super().changeEvent(e)
+        if e.type() in (QEvent.StyleChange, QEvent.EnabledChange):
+            self._color_cache.clear()
 
-        opt = QStyleOptionButton()
-        self.initStyleOption(opt)
+    def _textColor(self):
+        """ text color resolved once per enabled state and style sheet """
+        isEnabled = self.isEnabled()
+        if isEnabled in self._color_cache:
+            return self._color_cache[isEnabled]
 
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        self.style().drawControl(QStyle.CE_PushButton, opt, painter, self)
-
-        if not self.icon().isNull():
-            icon_rect = self.style().subElementRect(QStyle.SE_PushButtonContents, opt, self)
-            icon_rect.setWidth(min(icon_rect.width(), 32))
-            self._drawIcon(self.icon(), painter, icon_rect, opt.state & QStyle.State_On)
-
-        content_rect = self.style().subElementRect(QStyle.SE_PushButtonContents, opt, self)
-
-        large_font = QFont(cfg.FontFamily.value, self._large_size)
-        small_font = QFont(cfg.FontFamily.value, self._small_size)
-
-        fm_large = QFontMetrics(large_font)
-        fm_small = QFontMetrics(small_font)
-
-        large_width = fm_large.width(self._large_text)
-        small_width = fm_small.width(self._small_text)
-        total_width = large_width + small_width + self._spacing
-
-        start_x = content_rect.x() + (content_rect.width() - total_width) / 2
-        if not self.icon().isNull():
-            start_x += content_rect.width() * 0.1
-
-        base_y = content_rect.y() + (content_rect.height() + fm_large.ascent()) / 2 - fm_large.descent()
-
-        color = self._custom_color
         if self._custom_color is not None:
             color = self._custom_color
-        elif not self.isEnabled():
+        elif not isEnabled:
             color = QColor(0, 0, 0, 109)
         elif self.styleSheet():
-            style = self.styleSheet()
-            color_match = re.search(r'color:\s*(rgba?\([^)]+\)|#[0-9a-fA-F]{6,8})', style)
+            color = QColor(0, 159, 170)
+            color_match = re.search(r'color:\s*(rgba?\([^)]+\)|#[0-9a-fA-F]{6,8})', self.styleSheet())
             if color_match:
                 color_str = color_match.group(1)
                 if color_str.startswith('rgb'):
@@ -823,18 +990,74 @@ class CurriculumButton(QPushButton):
                         color = QColor(r, g, b, a)
                 else:
                     color = QColor(color_str)
-            else:
-                color = QColor(0, 159, 170)
         else:
             color = QColor(0, 159, 170)
 
-        painter.setPen(color)
+        self._color_cache[isEnabled] = color
+        return color
 
-        painter.setFont(large_font)
-        painter.drawText(int(start_x), int(base_y), self._large_text)
+    def _textLayout(self, opt: QStyleOptionButton):
+        """ static texts and positions recomputed only when the text, font, size or icon changes """
+        key = (self.size(), self.icon().isNull(), cfg.FontFamily.value)
+        if key == self._layout_key:
+            return self._layout
 
-        painter.setFont(small_font)
-        painter.drawText(int(start_x + large_width + self._spacing), int(base_y), self._small_text)
+        content_rect = self.style().subElementRect(QStyle.SE_PushButtonContents, opt, self)
+        large_font, fm_large = self.textFont(self._large_size)
+        small_font, fm_small = self.textFont(self._small_size)
+
+        large_width = fm_large.width(self._large_text)
+        small_width = fm_small.width(self._small_text)
+        total_width = large_width + small_width + self._spacing
+
+        start_x = content_rect.x() + (content_rect.width() - total_width) / 2
+        if not self.icon().isNull():
+            start_x += content_rect.width() * 0.1
+
+        base_y = content_rect.y() + (content_rect.height() + fm_large.ascent()) / 2 - fm_large.descent()
+
+        large_text = QStaticText(self._large_text)
+        large_text.setTextFormat(Qt.PlainText)
+        large_text.prepare(QTransform(), large_font)
+        small_text = QStaticText(self._small_text)
+        small_text.setTextFormat(Qt.PlainText)
+        small_text.prepare(QTransform(), small_font)
+
+        self._layout = (
+            (large_font, large_text, QPointF(int(start_x), int(base_y) - fm_large.ascent())),
+            (small_font, small_text, QPointF(int(start_x + large_width + self._spacing), int(base_y) - fm_small.ascent()))
+        )
+        self._layout_key = key
+        return self._layout
+
+    def paintEvent(self, event):
+        if not self.hasDualText():
+            return super().paintEvent(event)
+
+        opt = QStyleOptionButton()
+        self.initStyleOption(opt)
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        self.style().drawControl(QStyle.CE_PushButton, opt, painter, self)
+
+        if self._active:
+            color = QColor(self._textColor())
+            color.setAlpha(28)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(color)
+            painter.drawRoundedRect(QRectF(self.rect()), 6, 6)
+
+        if not self.icon().isNull():
+            icon_rect = self.style().subElementRect(QStyle.SE_PushButtonContents, opt, self)
+            icon_rect.setWidth(min(icon_rect.width(), 32))
+            self._drawIcon(self.icon(), painter, icon_rect, opt.state & QStyle.State_On)
+
+        painter.setPen(self._textColor())
+        for font, text, pos in self._textLayout(opt):
+            painter.setFont(font)
+            painter.drawStaticText(pos, text)
 
         painter.end()
 
@@ -847,12 +1070,15 @@ class CurriculumButton(QPushButton):
 class CardWidget(BackgroundAnimationWidget, QFrame):
     clicked = pyqtSignal()
 
+    chromeCacheSize = 8
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self._isClickEnabled = False
         self._borderRadius = 5
         self._gradientStartColor = QColor()
         self._gradientEndColor = QColor()
+        self._chromeCache = {}
         self.topHeight = 50
 
         self._styleIndex = 0
@@ -910,8 +1136,55 @@ class CardWidget(BackgroundAnimationWidget, QFrame):
         self._styleIndex = 3
         self.update()
 
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self._chromeCache.clear()
+
+    def _chromeKey(self):
+        key = (self.width(), self.height(), self.devicePixelRatioF(), self.borderRadius, self._styleIndex,
+               isDarkTheme(), self.isHover, self.isPressed)
+
+        if self._styleIndex == 0:
+            return key + (self.backgroundColor.rgba(),)
+        if self._styleIndex == 1:
+            return key + (self._gradientStartColor.rgba(), self._gradientEndColor.rgba())
+        if self._styleIndex == 3:
+            return key + (self.topHeight,)
+        return key
+
+    def _chromePixmap(self):
+        """ card background and border rendered once per size, style, theme and state """
+        key = self._chromeKey()
+        pixmap = self._chromeCache.pop(key, None)
+        if pixmap is None:
+            dpr = self.devicePixelRatioF()
+            pixmap = QPixmap(self.size() * dpr)
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+
+            painter = QPainter(pixmap)
+            self._drawChrome(painter)
+            painter.end()
+
+            while len(self._chromeCache) >= self.chromeCacheSize:
+                self._chromeCache.pop(next(iter(self._chromeCache)))
+
+        self._chromeCache[key] = pixmap
+        return pixmap
+
+    def isBackgroundAnimating(self) -> bool:
+        return self.backgroundColorAni.state() == QAbstractAnimation.Running
+
     def paintEvent(self, e):
         painter = QPainter(self)
+
+        # only style 0 keys on the animated color, its interpolated frames are never painted twice
+        if self.chromeCacheSize > 0 and not (self._styleIndex == 0 and self.isBackgroundAnimating()):
+            painter.drawPixmap(0, 0, self._chromePixmap())
+        else:
+            self._drawChrome(painter)
+
+    def _drawChrome(self, painter: QPainter):
         painter.setRenderHints(QPainter.Antialiasing)
 
         w, h = self.width(), self.height()
@@ -996,23 +1269,59 @@ class CardWidget(BackgroundAnimationWidget, QFrame):
     borderRadius = pyqtProperty(int, getBorderRadius, setBorderRadius)
 
 
-class WeatherThread(QThread):
-    weather_updated = pyqtSignal()
-    weather_error = pyqtSignal()
+class SkyconAtlas:
+    """ Shared LRU cache of skycon icons rasterized once per size, DPR and theme
 
-    def __init__(self, parent=None):
-        super().__init__(parent=parent)
-        self.isThreadRunning = True
-        self.data = {}
+    Icons are kept as QImage so they can be pre-warmed off the GUI thread,
+    ImageLabel converts them to a pixmap once when they are shown.
+    """
+
+    maxSize = 32
+    _images = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def image(cls, name: str, size: QSize, dpr: float) -> QImage:
+        key = (name, size.width(), size.height(), dpr, isDarkTheme())
+        with cls._lock:
+            image = cls._images.get(key)
+            if image is not None:
+                cls._images.move_to_end(key)
+                return image
+
+        image = cls._render(name, size, dpr)
+        with cls._lock:
+            cls._images[key] = image
+            while len(cls._images) > cls.maxSize:
+                cls._images.popitem(last=False)
+
+        return image
+
+    @classmethod
+    def prewarm(cls, names, size: QSize, dpr: float):
+        """ rasterize the icons on a background thread """
+        def run():
+            for name in names:
+                cls.image(name, size, dpr)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    @staticmethod
+    def _render(name: str, size: QSize, dpr: float) -> QImage:
+        image = QImage(size * dpr, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+
+        from PyQt5.QtSvg import QSvgRenderer
+
+        renderer = QSvgRenderer(f":/{name}.svg")
+        if renderer.isValid():
+            painter = QPainter(image)
+            painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+            renderer.render(painter, QRectF(image.rect()))
+            painter.end()
 
-    def run(self):
-        while self.isThreadRunning:
-            try:
-                self.data = requests.get("http://10.181.201.165:1908/api/weather", timeout=5).json()
-                self.weather_updated.emit()
-            except:
-                self.weather_error.emit()
-            time.sleep(5 * 60)
+        image.setDevicePixelRatio(dpr)
+        return image
 
 
 class WeatherInterface(QWidget):
@@ -1026,6 +1335,9 @@ class WeatherInterface(QWidget):
         self.gridLayout.setHorizontalSpacing(16)
 
         self.skycon = ""
+        self.keypoint = ""
+        self.temperature = None
+        self.isStale = False
         self.iconLabel = ImageLabel(self)
         self.iconLabel.setBorderRadius(0, 0, 0, 0)
         self.titleLabel = WeatherTitleLabel(self)
@@ -1034,8 +1346,7 @@ class WeatherInterface(QWidget):
         self.contentLabel.setWordWrap(True)
         self.contentLabel.setTextColor(QColor("white"))
 
-        self.iconLabel.setImage(":/LOADING.svg")
-        self.iconLabel.setFixedSize(48, 48)
+        self.setIcon("LOADING")
         self.titleLabel.setText("--°")
         self.contentLabel.setText("暂无数据")
 
@@ -1043,6 +1354,26 @@ class WeatherInterface(QWidget):
         self.gridLayout.addWidget(self.titleLabel, 0, 1, 1, 1)
         self.gridLayout.addWidget(self.contentLabel, 1, 0, 1, 2)
 
+    def hasData(self):
+        return bool(self.skycon)
+
+    def setIcon(self, name: str):
+        self.iconLabel.setImage(SkyconAtlas.image(name, QSize(48, 48), self.devicePixelRatioF()))
+        self.iconLabel.setFixedSize(48, 48)
+
+    def setKeypoint(self, keypoint: str):
+        self.keypoint = keypoint
+        self.isStale = False
+        self.contentLabel.setText(keypoint)
+
+    def setStale(self, isStale: bool):
+        """ keep showing the last good data and mark it as outdated """
+        if self.isStale == isStale or not self.hasData():
+            return
+
+        self.isStale = isStale
+        self.contentLabel.setText(f"{self.keypoint}（数据已过期）" if isStale else self.keypoint)
+
     def updateWeather(self):
         if self.contentLabel.text() == "暂无数据":
             self.styleChanged.emit("2f2cbc", "4bb4f0")
@@ -1062,25 +1393,6 @@ class WeatherInterface(QWidget):
             self.styleChanged.emit("2f2cbc", "4bb4f0")
 
 
-class MottoThread(QThread):
-    motto_updated = pyqtSignal()
-    motto_error = pyqtSignal()
-
-    def __init__(self, parent=None):
-        super().__init__(parent=parent)
-        self.isThreadRunning = True
-        self.data = {}
-
-    def run(self):
-        while self.isThreadRunning:
-            try:
-                self.data = requests.get("http://10.181.201.165:1908/api/pdb/sentence/today", timeout=5).json()
-                self.motto_updated.emit()
-            except:
-                self.motto_error.emit()
-            time.sleep(60 * 60)
-
-
 class MottoInterface(QWidget):
 
     def __init__(self, parent=None):
@@ -1103,6 +1415,13 @@ class MottoInterface(QWidget):
         self.chineseLabel.setHidden(True)
         self.englishLabel.setAlignment(Qt.AlignCenter)
 
+    def hasData(self):
+        return not self.chineseLabel.isHidden()
+
+    def setStale(self, isStale: bool):
+        """ keep showing the last good motto and mark it as outdated """
+        self.setToolTip("数据已过期" if isStale and self.hasData() else "")
+
 
 class CountdownInterface(QWidget):
 
@@ -1170,6 +1489,8 @@ class IntegratedCard(CardWidget):
             "WIND": "WIND"
         }
 
+        SkyconAtlas.prewarm(set(self.skyconMap.values()), QSize(48, 48), self.devicePixelRatioF())
+
         self.setFixedSize(200, 200)
         self.setBorderRadius(18)
 
@@ -1212,14 +1533,16 @@ class IntegratedCard(CardWidget):
         self.timer.timeout.connect(self.onTimeOut)
         self.timer.start(10000)
 
-        self.weatherThread = WeatherThread()
-        self.weatherThread.weather_updated.connect(self.onWeatherUpdated)
-        self.weatherThread.weather_error.connect(self.onWeatherError)
-        self.weatherThread.start()
-        self.mottoThread = MottoThread()
-        self.mottoThread.motto_updated.connect(self.onMottoUpdated)
-        self.mottoThread.motto_error.connect(self.onMottoError)
-        self.mottoThread.start()
+        self.weatherSnapshot = None
+        self.weatherBias = 0.0
+        self.mottoSnapshot = None
+        self.fetchThread = None
+        self.startFetchThread()
+
+        self.forecastTimer = QTimer(self)
+        self.forecastTimer.timeout.connect(self.onForecastTimeOut)
+        if cfg.ForecastMode.value:
+            self.forecastTimer.start(60 * 1000)
 
     def event(self, event):
         if event.type() == QEvent.Gesture:
@@ -1277,28 +1600,87 @@ class IntegratedCard(CardWidget):
             self.stackedWidget.setCurrentIndex(0)
             self.weatherInterface.updateWeather()
 
-    def onWeatherUpdated(self):
-        self.weatherInterface.titleLabel.setText(f"{round(self.weatherThread.data['result']['realtime']['temperature'])}°")
-        self.weatherInterface.contentLabel.setText(f"{self.weatherThread.data['result']['forecast_keypoint']}")
-        icon = self.skyconMap.get(self.weatherThread.data['result']['realtime']['skycon'], "LOADING")
-        self.weatherInterface.iconLabel.setImage(f":/{icon}.svg")
-        self.weatherInterface.iconLabel.setFixedSize(48, 48)
-        self.weatherInterface.skycon = self.weatherThread.data['result']['realtime']['skycon']
-
-    def onWeatherError(self):
-        self.weatherInterface.iconLabel.setImage(":/LOADING.svg")
-        self.weatherInterface.iconLabel.setFixedSize(48, 48)
+    def startFetchThread(self):
+        forecastInterval = cfg.ForecastInterval.value * 60 if cfg.ForecastMode.value else None
+        self.fetchThread = FetchThread(cfg.Endpoints.value, forecastInterval=forecastInterval,
+                                       resyncThreshold=cfg.ResyncThreshold.value)
+        self.fetchThread.weather_updated.connect(self.onWeatherUpdated)
+        self.fetchThread.weather_error.connect(self.onWeatherError)
+        self.fetchThread.motto_updated.connect(self.onMottoUpdated)
+        self.fetchThread.motto_error.connect(self.onMottoError)
+        self.fetchThread.start()
+
+    def stopFetchThread(self, timeout: int = 6000):
+        return self.fetchThread.stop(timeout)
+
+    def onWeatherUpdated(self, snapshot):
+        self.weatherSnapshot = snapshot
+        self.weatherBias = 0.0
+        expected = snapshot.temperatureAt(snapshot.timestamp)
+        if expected is not None:
+            self.weatherBias = snapshot.temperature - expected
+
+        self.weatherInterface.setStale(False)
+        self.applyWeather(snapshot.temperature, snapshot.skycon, snapshot.keypoint)
+
+    def onForecastTimeOut(self):
+        """ advance temperature and skycon along the cached hourly forecast between polls """
+        snapshot = self.weatherSnapshot
+        if snapshot is None:
+            return
+
+        now = time.time()
+        temperature = snapshot.temperatureAt(now)
+        if temperature is None:
+            return
+
+        # the observed skycon stays authoritative until it is older than a forecast poll
+        skycon = snapshot.skycon
+        if now - snapshot.timestamp > cfg.ForecastInterval.value * 60:
+            skycon = snapshot.skyconAt(now) or snapshot.skycon
+
+        self.applyWeather(temperature + self.weatherBias, skycon, snapshot.keypoint)
+
+    def applyWeather(self, temperature: float, skycon: str, keypoint: str):
+        """ update only the weather fields that changed """
+        if self.weatherInterface.temperature != round(temperature):
+            self.weatherInterface.temperature = round(temperature)
+            self.weatherInterface.titleLabel.setText(f"{round(temperature)}°")
+        if self.weatherInterface.keypoint != keypoint:
+            self.weatherInterface.setKeypoint(keypoint)
+        if self.weatherInterface.skycon != skycon:
+            self.weatherInterface.setIcon(self.skyconMap.get(skycon, "LOADING"))
+            self.weatherInterface.skycon = skycon
+
+    def onWeatherError(self, kind: str = ""):
+        if self.weatherInterface.hasData():
+            self.weatherInterface.setStale(True)
+            return
+
+        self.weatherSnapshot = None
+        self.weatherInterface.setIcon("LOADING")
         self.weatherInterface.titleLabel.setText("--°")
         self.weatherInterface.contentLabel.setText("暂无数据")
         self.weatherInterface.skycon = ""
+        self.weatherInterface.keypoint = ""
+        self.weatherInterface.temperature = None
 
-    def onMottoUpdated(self):
-        self.mottoInterface.chineseLabel.setText(self.mottoThread.data['chs'])
-        self.mottoInterface.englishLabel.setText(self.mottoThread.data['eng'])
+    def onMottoUpdated(self, snapshot):
+        last, self.mottoSnapshot = self.mottoSnapshot, snapshot
+        self.mottoInterface.setStale(False)
+        if last is not None and (last.chs, last.eng) == (snapshot.chs, snapshot.eng):
+            return
+
+        self.mottoInterface.chineseLabel.setText(snapshot.chs)
+        self.mottoInterface.englishLabel.setText(snapshot.eng)
         self.mottoInterface.chineseLabel.setHidden(False)
         self.mottoInterface.englishLabel.setAlignment(Qt.AlignLeft)
 
-    def onMottoError(self):
+    def onMottoError(self, kind: str = ""):
+        if self.mottoInterface.hasData():
+            self.mottoInterface.setStale(True)
+            return
+
         self.mottoInterface.chineseLabel.setText("")
         self.mottoInterface.englishLabel.setText("暂无数据")
         self.mottoInterface.chineseLabel.setHidden(True)
@@ -1313,89 +1695,430 @@ class IntegratedCard(CardWidget):
             self.setCountdownStyle()
 
 
-class CurriculumCard(CardWidget):
+class CurriculumView(QWidget):
+    """ Buttons of one day's curriculum, shown as the content of CurriculumCard.scrollArea """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.setStyleSheet("background: transparent;")
+        self.date = None
+        self.buttons = []
+        self.entries = []
+
+        self.nullLabel = MottoLabel(self)
+        self.nullLabel.setTextColor(QColor('grey'))
+        self.nullLabel.setText("无课程")
+        self.nullLabel.setHidden(True)
+
+        self.contentLayout = QVBoxLayout(self)
+        self.contentLayout.setContentsMargins(25, 10, 10, 10)
+        self.contentLayout.setSpacing(0)
+        self.contentLayout.addWidget(self.nullLabel, Qt.AlignCenter)
+        self.contentLayout.addStretch()
+
+    @staticmethod
+    def normalizeEntry(item):
+        """ (name, subtitle, path) of a config entry """
+        return str(item[0]), str(item[1]) or ' ', str(item[2]) if item[2] else ""
+
+    def createButton(self):
+        btn = CurriculumButton(self)
+        btn.setFixedWidth(150)
+        btn.setTextColor(cfg.FontColor.value)
+        btn.installEventFilter(ToolTipFilter(btn, 0, ToolTipPosition.BOTTOM))
+        self.contentLayout.insertWidget(self.contentLayout.count() - 1, btn, Qt.AlignCenter)
+        self.buttons.append(btn)
+        return btn
+
+    def setEntries(self, entries: list):
+        """ show `entries`, updating only the buttons whose entry changed
+
+        Buttons are pooled: surplus ones are hidden instead of deleted and reused by later, longer lists.
+        """
+        entries = [self.normalizeEntry(item) for item in entries]
+        self.setUpdatesEnabled(False)
+
+        for i, entry in enumerate(entries):
+            if i < len(self.buttons):
+                btn = self.buttons[i]
+                old = self.entries[i] if i < len(self.entries) else None
+            else:
+                btn, old = self.createButton(), None
+
+            if old is None or old[:2] != entry[:2]:
+                btn.setDualText(entry[0], entry[1])
+            if old is None or old[2] != entry[2]:
+                btn.setUrl(QUrl.fromLocalFile(entry[2]) if entry[2] else QUrl())
+                btn.setToolTip(entry[2])
+            if btn.isHidden():
+                btn.setHidden(False)
+
+        for btn in self.buttons[len(entries):]:
+            btn.setHidden(True)
+
+        self.entries = entries
+        self.nullLabel.setHidden(bool(entries))
+        self.setUpdatesEnabled(True)
+
+    def updateFont(self):
+        for btn in self.buttons:
+            btn.setFontSizes(cfg.FontSizeBig.value, cfg.FontSizeSmall.value)
+            btn.setTextColor(cfg.FontColor.value)
+            btn.invalidateTextCache()
+
+    def setActiveIndex(self, index: int):
+        for i, btn in enumerate(self.buttons):
+            btn.setActive(i == index and not btn.isHidden())
+
+    def contentHeight(self) -> int:
+        return self.sizeHint().height()
+
+
+class CurriculumListModel(QAbstractListModel):
+    """ Entries of one day's curriculum, (name, subtitle, path) per row """
+
+    SubtitleRole = Qt.UserRole
+    ActiveRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.entries = []
+        self.activeRow = -1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        name, subtitle, path = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role == self.SubtitleRole:
+            return subtitle
+        if role == Qt.ToolTipRole:
+            return path or None
+        if role == self.ActiveRole:
+            return index.row() == self.activeRow
+        return None
+
+    def setEntries(self, entries: list):
+        """ replace the entries, signalling only the rows that were added, removed or changed """
+        old = self.entries
+        if len(entries) > len(old):
+            self.beginInsertRows(QModelIndex(), len(old), len(entries) - 1)
+            self.entries = old + entries[len(old):]
+            self.endInsertRows()
+        elif len(entries) < len(old):
+            self.beginRemoveRows(QModelIndex(), len(entries), len(old) - 1)
+            self.entries = old[:len(entries)]
+            self.endRemoveRows()
+
+        for row in range(min(len(old), len(entries))):
+            if old[row] != entries[row]:
+                self.entries[row] = entries[row]
+                self.dataChanged.emit(self.index(row), self.index(row))
+
+    def setActiveRow(self, row: int):
+        last, self.activeRow = self.activeRow, row
+        for r in {last, row}:
+            if 0 <= r < len(self.entries):
+                self.dataChanged.emit(self.index(r), self.index(r), [self.ActiveRole])
+
+
+class CurriculumDelegate(QStyledItemDelegate):
+    """ Paints a row with the look of a dual-text CurriculumButton """
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setFixedWidth(200)
-        self.setBorderRadius(18)
-        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Preferred)
-        self.setMottoStyle()
+        self.margin = 25
+        self.buttonWidth = 150
+
+    def _textColor(self):
+        color = QColor(cfg.FontColor.value)
+        return color if color.isValid() else QColor(0, 159, 170)
+
+    def rowHeight(self) -> int:
+        fm_large = CurriculumButton.textFont(cfg.FontSizeBig.value)[1]
+        fm_small = CurriculumButton.textFont(cfg.FontSizeSmall.value)[1]
+        return max(fm_large.height(), fm_small.height()) + 12
+
+    def sizeHint(self, option, index):
+        return QSize(self.margin + self.buttonWidth, self.rowHeight())
+
+    def paint(self, painter: QPainter, option, index: QModelIndex):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = QRect(option.rect.x() + self.margin, option.rect.y(), self.buttonWidth, option.rect.height())
+        color = self._textColor()
+
+        background = None
+        if index.data(CurriculumListModel.ActiveRole):
+            background = QColor(color)
+            background.setAlpha(28)
+        elif option.state & QStyle.State_MouseOver:
+            background = QColor(0, 0, 0, 10)
+        if background is not None:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(background)
+            painter.drawRoundedRect(QRectF(rect), 6, 6)
+
+        large_text = index.data(Qt.DisplayRole)
+        small_text = index.data(CurriculumListModel.SubtitleRole)
+        large_font, fm_large = CurriculumButton.textFont(cfg.FontSizeBig.value)
+        small_font, fm_small = CurriculumButton.textFont(cfg.FontSizeSmall.value)
+        large_width = fm_large.width(large_text)
+        content_rect = rect.adjusted(12, 6, -12, -6)
+
+        start_x = content_rect.x() + (content_rect.width() - large_width - fm_small.width(small_text)) / 2
+        base_y = content_rect.y() + (content_rect.height() + fm_large.ascent()) / 2 - fm_large.descent()
+
+        painter.setPen(color)
+        painter.setFont(large_font)
+        painter.drawText(QPointF(int(start_x), int(base_y)), large_text)
+        painter.setFont(small_font)
+        painter.drawText(QPointF(int(start_x + large_width), int(base_y)), small_text)
+        painter.restore()
+
+
+class CurriculumListView(QListView):
+    """ Virtualized CurriculumView: only the visible rows are painted and no widget is created per entry """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.date = None
+        self.listModel = CurriculumListModel(self)
+        self.rowDelegate = CurriculumDelegate(self)
+        self.setModel(self.listModel)
+        self.setItemDelegate(self.rowDelegate)
+        self.scrollDelegate = SmoothScrollDelegate(self, True)
+
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QListView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setViewportMargins(0, 10, 0, 10)
+        self.setStyleSheet("QListView{border: none; background: transparent}")
+        self.viewport().setCursor(Qt.PointingHandCursor)
+        self.clicked.connect(self._onClicked)
 
         self.nullLabel = MottoLabel(self)
         self.nullLabel.setTextColor(QColor('grey'))
         self.nullLabel.setText("无课程")
+        self.nullLabel.move(25, 10)
         self.nullLabel.setHidden(True)
 
-        self.mainLayout = QVBoxLayout(self)
-        self.mainLayout.setContentsMargins(0, 0, 0, 0)
-        self.mainLayout.setSpacing(0)
+    @property
+    def entries(self):
+        return self.listModel.entries
 
-        self.scrollArea = SmoothScrollArea(self)
-        self.scrollArea.setWidgetResizable(True)
-        self.scrollArea.enableTransparentBackground()
+    def setEntries(self, entries: list):
+        self.listModel.setEntries([CurriculumView.normalizeEntry(item) for item in entries])
+        self.nullLabel.setHidden(bool(self.listModel.entries))
 
-        self.scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+    def updateFont(self):
+        self.scheduleDelayedItemsLayout()
+        self.viewport().update()
 
-        self.contentWidget = QWidget()
-        self.contentWidget.setStyleSheet("background: transparent;")
-        self.contentLayout = QVBoxLayout(self.contentWidget)
-        self.contentLayout.setContentsMargins(25, 10, 10, 10)
-        self.contentLayout.setSpacing(0)
-        self.contentLayout.addWidget(self.nullLabel, Qt.AlignCenter)
+    def setActiveIndex(self, index: int):
+        self.listModel.setActiveRow(index)
 
-        self.scrollArea.setWidget(self.contentWidget)
-        self.mainLayout.addWidget(self.scrollArea)
-
-        dayOfWeek = QDate.currentDate().dayOfWeek()
-        if dayOfWeek == 1:
-            lst = cfg.Mon.value
-        elif dayOfWeek == 2:
-            lst = cfg.Tue.value
-        elif dayOfWeek == 3:
-            lst = cfg.Wed.value
-        elif dayOfWeek == 4:
-            lst = cfg.Thu.value
-        elif dayOfWeek == 5:
-            lst = cfg.Fri.value
-        elif dayOfWeek == 6:
-            lst = cfg.Sat.value
-        else:
-            lst = cfg.Sun.value
+    def contentHeight(self) -> int:
+        return max(1, len(self.entries)) * self.rowDelegate.rowHeight() + 20
 
-        if lst:
-            for item in lst:
-                btn = CurriculumButton(self.contentWidget)
-                if str(item[1]):
-                    btn.setDualText(str(item[0]), str(item[1]))
-                else:
-                    btn.setDualText(str(item[0]), ' ')
-                btn.setFixedWidth(150)
-                btn.setTextColor(cfg.FontColor.value)
+    def _onClicked(self, index: QModelIndex):
+        path = self.listModel.entries[index.row()][2]
+        if path and os.path.exists(path):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(path))
 
-                if item[2]:
-                    btn.setUrl(QUrl.fromLocalFile(str(item[2])))
-                    btn.setToolTip(str(item[2]))
-                    btn.installEventFilter(ToolTipFilter(btn, 0, ToolTipPosition.BOTTOM))
 
-                self.contentLayout.addWidget(btn, Qt.AlignCenter)
-        else:
-            self.nullLabel.setHidden(False)
+class CurriculumCard(CardWidget):
 
-        self.contentLayout.addStretch()
+    WEEKDAYS = WEEKDAYS
+
+    def __init__(self, parent=None, isVirtualized: bool = None):
+        super().__init__(parent)
+        self.setFixedWidth(200)
+        self.setBorderRadius(18)
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Preferred)
+        self.setMottoStyle()
+        self.isVirtualized = cfg.Virtualized.value if isVirtualized is None else isVirtualized
+
+        self.mainLayout = QVBoxLayout(self)
+        self.mainLayout.setContentsMargins(0, 0, 0, 0)
+        self.mainLayout.setSpacing(0)
 
-        if self.scrollArea and self.contentWidget:
-            contentHeight = self.contentWidget.sizeHint().height()
+        self.contentWidget = self.createView()
+        self.nextView = None
+
+        self.timetable = Timetable.compile(cfg)
+        self.activeIndex = -1
+        self.periodTimer = QTimer(self)
+        self.periodTimer.setSingleShot(True)
+        self.periodTimer.setTimerType(Qt.PreciseTimer)
+        self.periodTimer.timeout.connect(self.updatePeriod)
+
+        if self.isVirtualized:
+            self.scrollArea = None
+            self.viewStack = QStackedWidget(self)
+            self.viewStack.addWidget(self.contentWidget)
+            self.mainLayout.addWidget(self.viewStack)
+        else:
+            self.scrollArea = SmoothScrollArea(self)
+            self.scrollArea.setWidgetResizable(True)
+            self.scrollArea.enableTransparentBackground()
+            self.scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+            self.scrollArea.setWidget(self.contentWidget)
+            self.mainLayout.addWidget(self.scrollArea)
+
+        self.loadCurriculum()
+
+    @staticmethod
+    def dayItem(dayOfWeek: int = None):
+        """ config item holding the curriculum of `dayOfWeek`, today by default """
+        dayOfWeek = dayOfWeek or QDate.currentDate().dayOfWeek()
+        return getattr(cfg, CurriculumCard.WEEKDAYS[dayOfWeek - 1])
+
+    def createView(self):
+        return CurriculumListView() if self.isVirtualized else CurriculumView()
+
+    def scrollWidget(self):
+        return self.contentWidget if self.isVirtualized else self.scrollArea
+
+    def loadCurriculum(self):
+        """ show the curriculum of today """
+        self.contentWidget.date = QDate.currentDate()
+        self.contentWidget.setEntries(self.dayItem().value)
+        self.updateHeight()
+        self.updatePeriod()
+
+    def updatePeriod(self):
+        """ highlight the current period and wait for the next start or end of one """
+        table = self.timetable.day(self.contentWidget.date.dayOfWeek())
+        minute = QTime.currentTime().msecsSinceStartOfDay() / 60000
+        current, _ = table.lookup(minute)
+
+        self.contentWidget.setActiveIndex(current)
+        if current != self.activeIndex and 0 <= current < len(self.contentWidget.entries):
+            self.ensureEntryVisible(current)
+        self.activeIndex = current
+
+        boundary = table.nextBoundary(minute)
+        if boundary is None:
+            self.periodTimer.stop()
+        else:
+            self.periodTimer.start(int((boundary - minute) * 60000) + 50)
+
+    def ensureEntryVisible(self, index: int):
+        if self.isVirtualized:
+            self.contentWidget.scrollTo(self.contentWidget.listModel.index(index))
+        else:
+            self.scrollArea.ensureWidgetVisible(self.contentWidget.buttons[index])
+
+    def prepareDay(self, date: QDate):
+        """ fill the off-screen view with the curriculum of `date`, reusing the view of the previous day """
+        view = self.nextView or self.createView()
+        view.setEntries(self.dayItem(date.dayOfWeek()).value)
+        view.date = date
+        self.nextView = view
+
+    def switchDay(self, date: QDate):
+        """ swap in the view prepared for `date` """
+        if self.nextView is None or self.nextView.date != date:
+            self.prepareDay(date)
+
+        if self.isVirtualized:
+            view = self.contentWidget
+            if self.viewStack.indexOf(self.nextView) < 0:
+                self.viewStack.addWidget(self.nextView)
+            self.viewStack.setCurrentWidget(self.nextView)
+        else:
+            view = self.scrollArea.takeWidget()
+            self.scrollArea.setWidget(self.nextView)
+
+        self.contentWidget, self.nextView = self.nextView, view
+        self.updateHeight()
+        self.activeIndex = -1
+        self.updatePeriod()
+
+    def updateFont(self):
+        """ apply the font settings to the existing buttons """
+        CurriculumButton.clearFontCache()
+        self.contentWidget.updateFont()
+        if self.nextView:
+            self.nextView.updateFont()
+        self.updateHeight()
+
+    def updateHeight(self):
+        if self.scrollWidget() and self.contentWidget:
+            contentHeight = self.contentWidget.contentHeight()
             maxHeight = QApplication.desktop().availableGeometry().height() - 260
             if contentHeight > maxHeight:
                 self.setFixedHeight(maxHeight)
-                self.scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+                self.scrollWidget().setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
             elif contentHeight <= 400:
                 self.setFixedHeight(400)
-                self.scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+                self.scrollWidget().setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
             else:
                 self.setFixedHeight(contentHeight)
-                self.scrollArea.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+                self.scrollWidget().setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+
+class DayScheduler(QObject):
+    """ Emits dayChanged at local midnight and after resume or a wall-clock jump
+
+    dayApproaching is emitted `prepareAhead` seconds before midnight so the next day can be built ahead of the switch.
+    """
+
+    dayApproaching = pyqtSignal(QDate)
+    dayChanged = pyqtSignal(QDate)
+    timeJumped = pyqtSignal()
+
+    def __init__(self, prepareAhead: int = 300, checkInterval: int = 60, parent=None):
+        super().__init__(parent=parent)
+        self.date = QDate.currentDate()
+        self.prepareAhead = prepareAhead
+        self._offset = time.time() - time.monotonic()
+
+        self.dayTimer = QTimer(self)
+        self.dayTimer.setSingleShot(True)
+        self.dayTimer.setTimerType(Qt.PreciseTimer)
+        self.dayTimer.timeout.connect(self.check)
+
+        self.prepareTimer = QTimer(self)
+        self.prepareTimer.setSingleShot(True)
+        self.prepareTimer.timeout.connect(lambda: self.dayApproaching.emit(self.date.addDays(1)))
+
+        self.watchTimer = QTimer(self)
+        self.watchTimer.timeout.connect(self._onWatchTimeOut)
+        self.watchTimer.start(checkInterval * 1000)
+        self._schedule()
+
+    def _schedule(self):
+        remaining = secondsUntilMidnight()
+        self.dayTimer.start(int(remaining * 1000) + 500)
+        self.prepareTimer.start(int(max(0, remaining - self.prepareAhead) * 1000))
+
+    def _onWatchTimeOut(self):
+        """ the monotonic clock stops while suspended and ignores clock changes, the wall clock does not """
+        offset = time.time() - time.monotonic()
+        if abs(offset - self._offset) > 2:
+            self.check()
+            self.timeJumped.emit()
+        elif QDate.currentDate() != self.date:
+            self.check()
+
+    def check(self):
+        """ emit dayChanged if the date moved and schedule the next midnight """
+        self._offset = time.time() - time.monotonic()
+        today = QDate.currentDate()
+        if today != self.date:
+            self.date = today
+            self.dayChanged.emit(today)
+
+        self._schedule()
 
 
 class Main(QWidget):
@@ -1429,6 +2152,58 @@ class Main(QWidget):
         self.createTrayIcon()
         self.tray_icon.activated.connect(self.trayIconActivated)
 
+        self.configWatcher = ConfigWatcher(cfg, parent=self)
+        self.configWatcher.itemsChanged.connect(self.onConfigChanged)
+
+        self.dayScheduler = DayScheduler(parent=self)
+        self.dayScheduler.dayApproaching.connect(self.curriculumCard.prepareDay)
+        self.dayScheduler.dayChanged.connect(self.onDayChanged)
+        self.dayScheduler.timeJumped.connect(self.curriculumCard.updatePeriod)
+
+        self.ipcServer = IpcServer(parent=self)
+        self.ipcServer.commandReceived.connect(self.onCommand)
+
+    def onCommand(self, command: str):
+        """ handle a command sent by another launch through NeonIpc """
+        if command == "show":
+            self.show()
+            self.raise_()
+            self.activateWindow()
+        elif command == "refresh":
+            self.refresh()
+        elif command == "restart":
+            self.reload()
+
+    def reload(self):
+        """ soft restart: apply the config again and rebuild today's views, without a new process or fetch """
+        self.configWatcher.reload()
+        self.dayScheduler.check()
+        self.curriculumCard.loadCurriculum()
+        self.integratedCard.countdownInterface.updateCountdown()
+        self.show()
+
+    def onDayChanged(self, date: QDate):
+        self.curriculumCard.switchDay(date)
+        self.integratedCard.countdownInterface.updateCountdown()
+
+    def onConfigChanged(self, names: set):
+        """ apply only the settings that changed in the config file """
+        if names & {"Event", "Date"}:
+            self.integratedCard.countdownInterface.updateCountdown()
+        nextView = self.curriculumCard.nextView
+        if nextView and CurriculumCard.WEEKDAYS[nextView.date.dayOfWeek() - 1] in names:
+            self.curriculumCard.prepareDay(nextView.date)
+        if names & {"FontFamily", "FontColor", "FontSizeBig", "FontSizeSmall"}:
+            self.curriculumCard.updateFont()
+        if names & set(WEEKDAYS + ["Periods"]):
+            self.curriculumCard.timetable = Timetable.compile(cfg)
+        if CurriculumCard.WEEKDAYS[QDate.currentDate().dayOfWeek() - 1] in names:
+            self.curriculumCard.loadCurriculum()
+        elif "Periods" in names:
+            self.curriculumCard.updatePeriod()
+        if "Endpoints" in names:
+            self.integratedCard.fetchThread.setEndpoints(cfg.Endpoints.value)
+
     def trayIconActivated(self, reason):
         if reason == QSystemTrayIcon.ActivationReason.Trigger or reason == QSystemTrayIcon.ActivationReason.Context:
             self._tray_icon_menu.exec(self.tray_icon.geometry().center())
@@ -1450,11 +2225,16 @@ class Main(QWidget):
         self._quit_action = QAction(FluentFontIcon("\ue7e8").icon(), "退出", self)
         self._quit_action.triggered.connect(self.quitApp)
 
+        self._metrics_action = QAction(FluentFontIcon("\ue9d9").icon(), "导出性能数据", self)
+        self._metrics_action.triggered.connect(self.dumpMetrics)
+
     def createTrayIcon(self):
         self._tray_icon_menu.addAction(self._refresh_action)
         self._tray_icon_menu.addSeparator()
         self._tray_icon_menu.addAction(self._setting_action)
         self._tray_icon_menu.addAction(self._help_action)
+        if metrics.isEnabled:
+            self._tray_icon_menu.addAction(self._metrics_action)
         self._tray_icon_menu.addSeparator()
         self._tray_icon_menu.addAction(self._restore_action)
         self._tray_icon_menu.addAction(self._hide_action)
@@ -1464,54 +2244,74 @@ class Main(QWidget):
         self.tray_icon.show()
 
     def refresh(self):
-        self.integratedCard.weatherThread.isThreadRunning = False
-        self.integratedCard.mottoThread.isThreadRunning = False
-        self.integratedCard.weatherThread.terminate()
-        self.integratedCard.mottoThread.terminate()
-
-        self.integratedCard.weatherThread = WeatherThread()
-        self.integratedCard.mottoThread = MottoThread()
-
-        self.integratedCard.weatherThread.weather_updated.connect(self.integratedCard.onWeatherUpdated)
-        self.integratedCard.weatherThread.weather_error.connect(self.integratedCard.onWeatherError)
-        self.integratedCard.mottoThread.motto_updated.connect(self.integratedCard.onMottoUpdated)
-        self.integratedCard.mottoThread.motto_error.connect(self.integratedCard.onMottoError)
-
-        self.integratedCard.weatherThread.start()
-        self.integratedCard.mottoThread.start()
+        self.integratedCard.fetchThread.fetchNow()
+        self.dayScheduler.check()
 
         self.integratedCard.countdownInterface.updateCountdown()
 
+    def dumpMetrics(self):
+        path = metrics.dump(cfg.MetricsFile.value or None)
+        self.tray_icon.showMessage("Neon", f"性能数据已导出到 {os.path.abspath(path)}")
+
     def openSetting(self):
         os.startfile(os.path.abspath("./config/config.json"))
 
     def quitApp(self):
         self.hide()
 
-        self.integratedCard.weatherThread.isThreadRunning = False
-        self.integratedCard.mottoThread.isThreadRunning = False
-        self.integratedCard.weatherThread.terminate()
-        self.integratedCard.mottoThread.terminate()
+        self.ipcServer.close()
 
+        # never block the event loop or terminate the worker, the aborted transfer and request timeouts bound it
+        fetchThread = self.integratedCard.fetchThread
+        fetchThread.finished.connect(self.onFetchThreadFinished)
+        self.integratedCard.stopFetchThread(0)
+        if not fetchThread.isRunning():
+            self.onFetchThreadFinished()
+
+    def onFetchThreadFinished(self):
+        if metrics.isEnabled:
+            metrics.histogram("fetch.shutdown").record(self.integratedCard.fetchThread.shutdownTime / 1000)
+            if cfg.MetricsFile.value:
+                metrics.dump(cfg.MetricsFile.value)
         QApplication.quit()
 
 
+def installMetrics():
+    """ time every custom widget paint, fetch signal dispatch and the event loop """
+    metrics.install(
+        [CardWidget, ImageLabel, CurriculumButton, PipsPager, FluentLabelBase],
+        [
+            (IntegratedCard, "onWeatherUpdated", lambda card: card.fetchThread.sources["weather"].emittedAt),
+            (IntegratedCard, "onMottoUpdated", lambda card: card.fetchThread.sources["motto"].emittedAt)
+        ],
+        dumpPath=cfg.MetricsFile.value,
+        dumpInterval=cfg.MetricsInterval.value
+    )
+
+
+def main():
+    with Mutex():
+        QApplication.setHighDpiScaleFactorRoundingPolicy(
+            Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
+        QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
+        QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
+
+        if isDark():
+            setTheme(Theme.DARK)
+        else:
+            setTheme(Theme.LIGHT)
+
+        app = QApplication(sys.argv)
+        if cfg.Metrics.value or os.environ.get("NEON_METRICS"):
+            installMetrics()
+
+        w = Main()
+
+        # only the lock holder may listen, listen() removes a socket file it can not bind
+        w.ipcServer.listen()
+        w.show()
+        app.exec()
+
+
 if __name__ == '__main__':
-    if (len(sys.argv) == 2 and sys.argv[1] == '--force-start') or cfg.AutoRun.value:
-        with Mutex():
-            QApplication.setHighDpiScaleFactorRoundingPolicy(
-                Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
-            QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
-            QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
-
-            if isDark():
-                setTheme(Theme.DARK)
-            else:
-                setTheme(Theme.LIGHT)
-
-            app = QApplication(sys.argv)
-            w = Main()
-            w.show()
-            app.exec()
-    else:
-        sys.exit()
+    main()
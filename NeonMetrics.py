@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+from PyQt5.QtCore import Qt, QObject, QTimer
+
+
+class Histogram:
+    """ Fixed-size histogram of durations with power-of-two microsecond buckets """
+
+    def __init__(self, name: str, bucketCount: int = 24):
+        self.name = name
+        self.buckets = [0] * bucketCount
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def record(self, seconds: float):
+        us = int(seconds * 1e6)
+        self.buckets[min(max(us, 0).bit_length(), len(self.buckets) - 1)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def percentile(self, p: float) -> float:
+        """ upper bound in ms of the bucket holding the `p`-th percentile """
+        if not self.count:
+            return 0.0
+
+        threshold = self.count * p / 100
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= threshold:
+                return (1 << i) / 1000
+        return self.maximum * 1000
+
+    def toDict(self):
+        return {
+            "count": self.count,
+            "meanMs": self.total / self.count * 1000 if self.count else 0.0,
+            "maxMs": self.maximum * 1000,
+            "p50Ms": self.percentile(50),
+            "p99Ms": self.percentile(99),
+            "buckets": {f"<{(1 << i) / 1000:g}ms": n for i, n in enumerate(self.buckets) if n}
+        }
+
+
+class Metrics(QObject):
+    """ Opt-in frame-time and event-loop latency instrumentation
+
+    Nothing is wrapped or scheduled until `install` is called, so a disabled build pays nothing.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.isEnabled = False
+        self.histograms = {}
+        self.probeTimer = None
+        self.dumpTimer = None
+        self.dumpPath = ""
+        self._lastProbe = 0.0
+        self._probeInterval = 0.0
+
+    def histogram(self, name: str) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name)
+        return self.histograms[name]
+
+    def install(self, widgetClasses, slots, probeInterval: int = 10, dumpPath: str = "", dumpInterval: int = 60):
+        """ instrument before any widget is created
+
+        Parameters
+        ----------
+        widgetClasses: list
+            classes whose paintEvent is timed per concrete widget type
+
+        slots: list
+            (class, method name, callable returning the perf_counter time of the emit) triples
+
+        probeInterval: int
+            interval of the event-loop lag probe in ms
+
+        dumpPath, dumpInterval:
+            write the histograms to `dumpPath` every `dumpInterval` seconds when a path is given
+        """
+        if self.isEnabled:
+            return
+
+        self.isEnabled = True
+        for cls in widgetClasses:
+            cls.paintEvent = self._timedPaintEvent(cls.paintEvent)
+        for cls, name, emittedAt in slots:
+            setattr(cls, name, self._timedSlot(getattr(cls, name), name, emittedAt))
+
+        self._probeInterval = probeInterval / 1000
+        self._lastProbe = time.perf_counter()
+        self.probeTimer = QTimer(self)
+        self.probeTimer.setTimerType(Qt.PreciseTimer)
+        self.probeTimer.timeout.connect(self._onProbe)
+        self.probeTimer.start(probeInterval)
+
+        if dumpPath:
+            self.dumpPath = dumpPath
+            self.dumpTimer = QTimer(self)
+            self.dumpTimer.timeout.connect(lambda: self.dump(self.dumpPath))
+            self.dumpTimer.start(dumpInterval * 1000)
+
+    def _timedPaintEvent(self, paintEvent):
+        def wrapper(widget, e):
+            start = time.perf_counter()
+            paintEvent(widget, e)
+            self.histogram(f"paint.{type(widget).__name__}").record(time.perf_counter() - start)
+
+        return wrapper
+
+    def _timedSlot(self, slot, name: str, emittedAt):
+        histogram = self.histogram(f"dispatch.{name}")
+
+        def wrapper(obj, *args):
+            histogram.record(time.perf_counter() - emittedAt(obj))
+            return slot(obj, *args)
+
+        return wrapper
+
+    def _onProbe(self):
+        now = time.perf_counter()
+        self.histogram("eventLoop.lag").record(max(0.0, now - self._lastProbe - self._probeInterval))
+        self._lastProbe = now
+
+    def toDict(self):
+        return {name: histogram.toDict() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, path: str = None):
+        """ write every histogram as json and return the path """
+        path = path or time.strftime("metrics-%Y%m%d-%H%M%S.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.toDict(), f, indent=4)
+        return path
+
+
+metrics = Metrics()
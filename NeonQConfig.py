@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import os
+import copy
+import json
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+from qfluentwidgets import qconfig, QConfig, ConfigItem, OptionsConfigItem, BoolValidator, OptionsValidator, \
+    FolderValidator, RangeConfigItem, RangeValidator, EnumSerializer, ConfigValidator
+from NeonConfig import CONFIG_FILE
+
+class UrlListValidator(ConfigValidator):
+    """ List of url strings, a single string is read as a one-item list """
+
+    def validate(self, value):
+        return isinstance(value, list) and all(isinstance(url, str) and url.strip() for url in value)
+
+    def correct(self, value):
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, (list, tuple)):
+            return []
+        return [url.strip() for url in value if isinstance(url, str) and url.strip()]
+
+
+class Config(QConfig):
+    AutoRun = ConfigItem("MainWindow", "AutoRun", True, BoolValidator())
+
+    Event = ConfigItem("Countdown", "Event", "", ConfigValidator())
+    Date = ConfigItem("Countdown", "Date", "", ConfigValidator())
+
+    FontFamily = ConfigItem("Curriculum", "FontFamily", "Segoe UI", ConfigValidator())
+    FontColor = ConfigItem("Curriculum", "FontColor", "#0179D4", ConfigValidator())
+    FontSizeBig = ConfigItem("Curriculum", "FontSizeBig", 24, ConfigValidator())
+    FontSizeSmall = ConfigItem("Curriculum", "FontSizeSmall", 14, ConfigValidator())
+
+    Mon = ConfigItem("Curriculum", "Mon", [], ConfigValidator())
+    Tue = ConfigItem("Curriculum", "Tue", [], ConfigValidator())
+    Wed = ConfigItem("Curriculum", "Wed", [], ConfigValidator())
+    Thu = ConfigItem("Curriculum", "Thu", [], ConfigValidator())
+    Fri = ConfigItem("Curriculum", "Fri", [], ConfigValidator())
+    Sat = ConfigItem("Curriculum", "Sat", [], ConfigValidator())
+    Sun = ConfigItem("Curriculum", "Sun", [], ConfigValidator())
+    Periods = ConfigItem("Curriculum", "Periods", [], ConfigValidator())
+    Virtualized = ConfigItem("Curriculum", "Virtualized", False, BoolValidator())
+
+    Endpoints = ConfigItem("Network", "Endpoints", ["http://10.181.201.165:1908"], UrlListValidator())
+
+    ForecastMode = ConfigItem("Weather", "ForecastMode", False, BoolValidator())
+    ForecastInterval = RangeConfigItem("Weather", "ForecastInterval", 30, RangeValidator(10, 120))
+    ResyncThreshold = RangeConfigItem("Weather", "ResyncThreshold", 2, RangeValidator(1, 10))
+
+    Metrics = ConfigItem("Debug", "Metrics", False, BoolValidator())
+    MetricsFile = ConfigItem("Debug", "MetricsFile", "", ConfigValidator())
+    MetricsInterval = RangeConfigItem("Debug", "MetricsInterval", 60, RangeValidator(5, 3600))
+
+
+class ConfigWatcher(QObject):
+    """ Reloads the config file when it is saved and reports which items changed
+
+    Save bursts are coalesced by a single-shot timer, and a file that is not valid json is ignored until the
+    next save instead of resetting the items.
+    """
+
+    itemsChanged = pyqtSignal(set)
+
+    def __init__(self, config: QConfig, debounce: int = 300, parent=None):
+        super().__init__(parent=parent)
+        self.config = config
+        self.path = os.path.abspath(str(config.file))
+        self.items = {}
+        for name in dir(config.__class__):
+            item = getattr(config.__class__, name)
+            if isinstance(item, ConfigItem):
+                self.items[name] = item
+
+        self.debounceTimer = QTimer(self)
+        self.debounceTimer.setSingleShot(True)
+        self.debounceTimer.setInterval(debounce)
+        self.debounceTimer.timeout.connect(self.reload)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._onChanged)
+        self.watcher.directoryChanged.connect(self._onChanged)
+        self._watch()
+
+    def _watch(self):
+        """ editors that save atomically replace the file, which drops it from the watcher """
+        folder = os.path.dirname(self.path)
+        if os.path.isdir(folder) and folder not in self.watcher.directories():
+            self.watcher.addPath(folder)
+        if os.path.exists(self.path) and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+
+    def _onChanged(self, path: str):
+        self._watch()
+        self.debounceTimer.start()
+
+    def snapshot(self):
+        return {name: copy.deepcopy(item.value) for name, item in self.items.items()}
+
+    def validate(self):
+        """ parsed config file, or None when it is missing or half written """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except:
+            return None
+
+        return data if isinstance(data, dict) else None
+
+    def reload(self):
+        """ apply the file to the items again and emit the names of the items whose value changed
+
+        Values are set item by item instead of calling qconfig.load, which reconnects its theme slot on every call;
+        items whose key was deleted from the file fall back to their default.
+        """
+        data = self.validate()
+        if data is None:
+            return set()
+
+        old = self.snapshot()
+        for item in self.items.values():
+            if item.name:
+                section = data.get(item.group)
+                found = isinstance(section, dict) and item.name in section
+                value = section[item.name] if found else None
+            else:
+                found = item.group in data
+                value = data.get(item.group)
+
+            if not found:
+                item.value = item.defaultValue
+                continue
+            try:
+                item.deserializeFrom(value)
+            except:
+                item.value = item.defaultValue
+
+        changed = {name for name, value in self.snapshot().items() if value != old[name]}
+        if changed:
+            self.itemsChanged.emit(changed)
+        return changed
+
+
+cfg = Config()
+qconfig.load(CONFIG_FILE, cfg)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+from bisect import bisect_right
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def parsePeriod(text) -> tuple:
+    """ (start, end) in minutes since midnight of a "HH:MM-HH:MM" period, None if it is malformed """
+    try:
+        start, end = (part.strip().split(":") for part in str(text).split("-"))
+        start = int(start[0]) * 60 + int(start[1])
+        end = int(end[0]) * 60 + int(end[1])
+    except:
+        return None
+
+    if not 0 <= start < end <= 24 * 60:
+        return None
+    return start, end
+
+
+class DayTable:
+    """ Periods of one day as parallel arrays sorted by start time
+
+    The time of an entry comes from its optional fourth field, e.g. ["数学", "第三节", "", "10:00-10:45"],
+    or else from the period of the same index in the `Periods` config item. Entries without a time are
+    never current. Periods are expected not to overlap.
+    """
+
+    __slots__ = ("starts", "ends", "entries", "boundaries")
+
+    def __init__(self, entries: list, periods: list = ()):
+        slots = []
+        for i, item in enumerate(entries):
+            period = parsePeriod(item[3]) if len(item) > 3 and item[3] else None
+            if period is None and i < len(periods):
+                period = parsePeriod(periods[i])
+            if period:
+                slots.append((period[0], period[1], i))
+
+        slots.sort()
+        self.starts = array('H', (slot[0] for slot in slots))
+        self.ends = array('H', (slot[1] for slot in slots))
+        self.entries = array('H', (slot[2] for slot in slots))
+        self.boundaries = array('H', sorted(set(self.starts) | set(self.ends)))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lookup(self, minute: float):
+        """ (current, next) entry indices at `minute` since midnight, -1 when there is none """
+        i = bisect_right(self.starts, minute)
+        current = self.entries[i - 1] if i and minute < self.ends[i - 1] else -1
+        upcoming = self.entries[i] if i < len(self.starts) else -1
+        return current, upcoming
+
+    def nextBoundary(self, minute: float):
+        """ minutes since midnight of the first period start or end after `minute`, None after the last one """
+        i = bisect_right(self.boundaries, minute)
+        return self.boundaries[i] if i < len(self.boundaries) else None
+
+
+class Timetable:
+    """ Curriculum config compiled into one DayTable per weekday """
+
+    def __init__(self, days: list):
+        self.days = days
+
+    @classmethod
+    def compile(cls, config):
+        periods = config.Periods.value or []
+        return cls([DayTable(getattr(config, name).value or [], periods) for name in WEEKDAYS])
+
+    def day(self, dayOfWeek: int) -> DayTable:
+        return self.days[dayOfWeek - 1]
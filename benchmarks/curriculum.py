@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+CurriculumCard scaling benchmark of the widget and virtualized list modes
+
+Builds the card for days of 10, 100 and 1000 entries under the offscreen Qt platform and reports the construction
+time, the time of a first full paint, the time of an incremental update that changes one entry, the number of
+widgets and the peak of traced Python allocations, e.g.
+
+    python benchmarks/curriculum.py --entries 10 --entries 1000 --runs 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def makeEntries(n: int, revision: int = 0):
+    return [[f"课程 {i}", f"  第{i + 1}节", "", ""] for i in range(n - 1)] + [[f"课程 {n - 1}", f"  修订 {revision}", "", ""]]
+
+
+def measure(NeonMain, n: int, isVirtualized: bool, runs: int):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+    from PyQt5.QtWidgets import QWidget
+
+    item = NeonMain.CurriculumCard.dayItem()
+    build, paint, update, widgets, peak = [], [], [], 0, 0
+    for run in range(runs):
+        item.value = makeEntries(n)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        card = NeonMain.CurriculumCard(isVirtualized=isVirtualized)
+        build.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        card.show()
+        image = QImage(card.size(), QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        start = time.perf_counter()
+        card.render(image)
+        paint.append(time.perf_counter() - start)
+
+        item.value = makeEntries(n, run + 1)
+        start = time.perf_counter()
+        card.loadCurriculum()
+        update.append(time.perf_counter() - start)
+
+        widgets = len(card.findChildren(QWidget))
+        card.deleteLater()
+
+    return min(build), min(paint), min(update), widgets, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neon curriculum scaling benchmark")
+    parser.add_argument("--entries", type=int, action="append", help="entries per day, default 10, 100 and 1000")
+    parser.add_argument("--runs", type=int, default=3, help="cards built per case, the fastest run is reported")
+    args = parser.parse_args(argv)
+
+    os.chdir(tempfile.mkdtemp(prefix="neon-bench-"))
+
+    import NeonMain
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)
+    print(f"{'mode':<12}{'entries':>8}{'build ms':>10}{'paint ms':>10}{'update ms':>11}{'widgets':>9}{'peak KB':>9}")
+    for n in args.entries or [10, 100, 1000]:
+        for mode, isVirtualized in (("widgets", False), ("virtualized", True)):
+            build, paint, update, widgets, peak = measure(NeonMain, n, isVirtualized, args.runs)
+            print(f"{mode:<12}{n:>8}{build * 1000:>10.2f}{paint * 1000:>10.2f}{update * 1000:>11.2f}"
+                  f"{widgets:>9}{peak / 1024:>9.0f}")
+            app.processEvents()
+
+    app.quit()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
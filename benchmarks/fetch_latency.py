@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end fetch-to-paint latency benchmark
+
+Starts Main under the offscreen Qt platform against the local mock server and measures the time from the start
+of a fetch to the end of IntegratedCard.onWeatherUpdated / onMottoUpdated, e.g.
+
+    python benchmarks/fetch_latency.py --runs 50
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from mock_server import MockServer, Scenario
+
+SCENARIOS = {
+    "baseline": Scenario(),
+    "latency-100ms": Scenario(latency=0.1),
+    "errors-20%": Scenario(errorRate=0.2),
+    "slow-body": Scenario(bodyRate=64 * 1024, padding=32 * 1024),
+    "payload-512kb": Scenario(padding=512 * 1024),
+}
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))
+    return values[index]
+
+
+class Recorder:
+    """ Records the fetch-to-paint latency of the slots of IntegratedCard """
+
+    def __init__(self):
+        self.card = None
+        self.expected = None
+        self.samples = []
+        self.errors = 0
+        self.loop = None
+
+    def instrument(self, cardClass):
+        for name, source, isError in (("onWeatherUpdated", "weather", False), ("onWeatherError", "weather", True),
+                                      ("onMottoUpdated", "motto", False), ("onMottoError", "motto", True)):
+            setattr(cardClass, name, self._wrap(getattr(cardClass, name), source, isError))
+
+    def _wrap(self, slot, source, isError):
+        def wrapper(card, *args):
+            slot(card, *args)
+            self._record(card, source, isError)
+
+        return wrapper
+
+    def _record(self, card, source, isError):
+        self.card = card
+        if self.expected not in (source, "*"):
+            return
+
+        if isError:
+            self.errors += 1
+        else:
+            self.samples.append(time.perf_counter() - card.fetchThread.sources[source].startedAt)
+
+        if self.loop:
+            self.loop.quit()
+
+    def wait(self, source, timeout=15000):
+        from PyQt5.QtCore import QEventLoop, QTimer
+
+        self.expected = source
+        self.loop = QEventLoop()
+        timer = QTimer()
+        timer.setSingleShot(True)
+        timer.timeout.connect(self.loop.quit)
+        timer.start(timeout)
+        self.loop.exec_()
+        timer.stop()
+        self.loop = None
+        self.expected = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neon fetch-to-paint latency benchmark")
+    parser.add_argument("--runs", type=int, default=30, help="fetches per source and scenario")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="only run these scenarios")
+    parser.add_argument("--dead-mirror", action="store_true", help="list an unreachable mirror before the mock server")
+    args = parser.parse_args(argv)
+
+    os.chdir(tempfile.mkdtemp(prefix="neon-bench-"))
+
+    import psutil
+    import NeonMain
+    from NeonConfig import cfg
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)
+    process = psutil.Process()
+    server = MockServer().start()
+    cfg.Endpoints.value = (["http://127.0.0.1:9"] if args.dead_mirror else []) + [server.url]
+
+    recorder = Recorder()
+    recorder.instrument(NeonMain.IntegratedCard)
+    window = NeonMain.Main()
+    window.show()
+    recorder.wait("*")
+    card = window.integratedCard
+
+    print(f"{'scenario':<16}{'source':<10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'threads':>9}{'rss MB':>9}")
+    for name in args.scenario or SCENARIOS:
+        server.scenario = SCENARIOS[name]
+        for source in ("weather", "motto"):
+            recorder.samples, recorder.errors = [], 0
+            for _ in range(args.runs):
+                card.fetchThread.fetchNow(source)
+                recorder.wait(source)
+
+            samples = [s * 1000 for s in recorder.samples]
+            print(f"{name:<16}{source:<10}{percentile(samples, 50):>10.2f}{percentile(samples, 99):>10.2f}"
+                  f"{recorder.errors:>8}{process.num_threads():>9}{process.memory_info().rss / 2 ** 20:>9.1f}")
+
+    print(f"shutdown: {card.stopFetchThread():.1f} ms, requests served: {server.requestCount}")
+    server.stop()
+    window.tray_icon.hide()
+    app.quit()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
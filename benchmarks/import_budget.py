@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time budget of the Neon modules
+
+Imports every module in a fresh interpreter with `-X importtime` and checks it against
+benchmarks/import_budget.json:
+
+* forbidden: modules that must stay deferred, e.g. requests for NeonMain, fail as soon as they are imported
+* budget: cumulative ms of the module and of each of its direct imports, fail when exceeded by more than the
+  tolerance plus 1 ms of noise; a scenario without a recorded budget only gets a warning and its forbidden list
+  checked, record one with --save-budget on a full install
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --save-budget
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def importTimes(module: str, runs: int):
+    """ fastest cumulative ms of the module and its direct imports, and every module it imported """
+    cwd = tempfile.mkdtemp(prefix="neon-bench-")
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM="offscreen")
+    times, imported = {}, set()
+    for _ in range(runs):
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                 cwd=cwd, env=env, capture_output=True, text=True)
+        if process.returncode:
+            raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+        # children are printed before their parent, interpreter start-up imports come first at depth 0
+        subtree = []
+        for match in LINE.finditer(process.stderr):
+            name, depth, ms = match.group(4), len(match.group(3)) // 2, int(match.group(2)) / 1000
+            subtree.append((name, depth, ms))
+            if depth:
+                continue
+            if name == module:
+                for child, childDepth, childMs in subtree:
+                    imported.add(child)
+                    if childDepth <= 1:
+                        times[child] = min(times.get(child, childMs), childMs)
+            subtree = []
+
+    return times, imported
+
+
+def check(module: str, times: dict, imported: set, scenario: dict, tolerance: float):
+    """ problems of one module against its scenario in the budget file """
+    problems = []
+    for name in scenario.get("forbidden", []):
+        found = sorted(m for m in imported if m == name or m.startswith(name + "."))
+        if found:
+            problems.append(f"{module} imports {found[0]}, which must be deferred")
+
+    for name, budget in scenario.get("budget", {}).items():
+        if name in times and times[name] > budget * (1 + tolerance) + 1:
+            problems.append(f"{module}: {name} takes {times[name]:.1f} ms, budget {budget:.1f} ms")
+
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neon import-time budget")
+    parser.add_argument("--runs", type=int, default=5, help="interpreters started per module, the fastest wins")
+    parser.add_argument("--budget", default=BUDGET, help="budget file")
+    parser.add_argument("--save-budget", action="store_true", help="store the times of this run as the budget")
+    parser.add_argument("--module", action="append", help="only check these modules")
+    args = parser.parse_args(argv)
+
+    with open(args.budget, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    problems = []
+    for module, scenario in config["scenarios"].items():
+        if args.module and module not in args.module:
+            continue
+
+        try:
+            times, imported = importTimes(module, args.runs)
+        except RuntimeError as e:
+            problems.append(f"{module} failed to import: {e}")
+            continue
+
+        print(f"{module}: {times.get(module, 0):.1f} ms")
+        for name, ms in sorted(times.items(), key=lambda item: -item[1]):
+            if name != module and ms >= 1:
+                print(f"    {name:<40}{ms:>8.1f} ms")
+
+        if args.save_budget:
+            scenario["budget"] = {name: round(ms, 1) for name, ms in times.items() if ms >= 1 or name == module}
+            problems.extend(check(module, times, imported, scenario, 0))
+        else:
+            if not scenario.get("budget"):
+                print(f"WARNING {module} has no budget, record one with --save-budget")
+            problems.extend(check(module, times, imported, scenario, config.get("tolerance", 0.3)))
+
+    if args.save_budget:
+        with open(args.budget, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=4, ensure_ascii=False)
+            f.write("\n")
+        print(f"budget saved to {args.budget}")
+
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
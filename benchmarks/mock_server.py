@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the Neon API server
+
+Serves /api/weather and /api/pdb/sentence/today with configurable latency, error rate,
+slow bodies and payload padding, e.g.
+
+    python benchmarks/mock_server.py --port 1908 --latency 0.2 --error-rate 0.1
+"""
+
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# the real API reports hourly points in China Standard Time, whatever the zone of the machine
+CST = timezone(timedelta(hours=8))
+SKYCONS = ["CLEAR_DAY", "PARTLY_CLOUDY_DAY", "CLOUDY", "LIGHT_RAIN", "MODERATE_RAIN", "FOG", "LIGHT_SNOW", "WIND"]
+
+
+class Scenario:
+    """ Fault injection settings of the mock server """
+
+    def __init__(self, latency: float = 0.0, errorRate: float = 0.0, errorStatus: int = 500,
+                 bodyRate: int = 0, padding: int = 0, stable: bool = False):
+        self.latency = latency
+        self.errorRate = errorRate
+        self.errorStatus = errorStatus
+        self.bodyRate = bodyRate
+        self.padding = padding
+        self.stable = stable
+
+    def __repr__(self):
+        return (f"Scenario(latency={self.latency}, errorRate={self.errorRate}, bodyRate={self.bodyRate}, "
+                f"padding={self.padding}, stable={self.stable})")
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        scenario = self.server.scenario
+        self.server.requestCount += 1
+
+        if scenario.latency:
+            time.sleep(scenario.latency)
+
+        path = self.path.split("?")[0]
+        if path == "/":
+            return self._send(200, b"{}")
+
+        if path == "/api/weather":
+            payload = self.server.weatherPayload()
+        elif path == "/api/pdb/sentence/today":
+            payload = self.server.mottoPayload()
+        else:
+            return self._send(404, b'{"error": "not found"}')
+
+        if scenario.errorRate and random.random() < scenario.errorRate:
+            return self._send(scenario.errorStatus, b'{"error": "injected"}')
+
+        if scenario.padding:
+            payload["padding"] = "x" * scenario.padding
+
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", etag)
+
+        self._send(200, body, etag)
+
+    def _send(self, status: int, body: bytes, etag: str = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+
+        rate = self.server.scenario.bodyRate
+        if not rate:
+            self.wfile.write(body)
+            return
+
+        chunk = max(1, rate // 10)
+        for i in range(0, len(body), chunk):
+            self.wfile.write(body[i:i + chunk])
+            self.wfile.flush()
+            time.sleep(0.1)
+
+
+class MockServer(ThreadingHTTPServer):
+    """ Stand-in API server running on a background thread """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, scenario: Scenario = None, verbose: bool = False):
+        super().__init__(("127.0.0.1", port), MockHandler)
+        self.scenario = scenario or Scenario()
+        self.verbose = verbose
+        self.requestCount = 0
+        self._counter = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def weatherPayload(self):
+        if not self.scenario.stable:
+            self._counter += 1
+
+        skycon = SKYCONS[self._counter % len(SKYCONS)]
+        now = int(time.time()) // 3600 * 3600
+        return {
+            "status": "ok",
+            "server_time": int(time.time()),
+            "result": {
+                "realtime": {"temperature": 15 + self._counter % 20, "skycon": skycon},
+                "hourly": {
+                    "temperature": [
+                        {"datetime": datetime.fromtimestamp(now + i * 3600, CST).isoformat(timespec="minutes"),
+                         "value": 15 + (self._counter + i) % 20}
+                        for i in range(48)
+                    ],
+                    "skycon": [
+                        {"datetime": datetime.fromtimestamp(now + i * 3600, CST).isoformat(timespec="minutes"),
+                         "value": SKYCONS[(self._counter + i) % len(SKYCONS)]}
+                        for i in range(48)
+                    ]
+                },
+                "forecast_keypoint": f"模拟天气 #{self._counter}"
+            }
+        }
+
+    def mottoPayload(self):
+        return {
+            "chs": f"千里之行，始于足下。#{self._counter}",
+            "eng": f"A journey of a thousand miles begins with a single step. #{self._counter}"
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neon mock API server")
+    parser.add_argument("--port", type=int, default=1908)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--body-rate", type=int, default=0, help="trickle bodies at this many bytes per second")
+    parser.add_argument("--padding", type=int, default=0, help="extra bytes added to every payload")
+    parser.add_argument("--stable", action="store_true", help="serve the same payload on every request")
+    args = parser.parse_args(argv)
+
+    scenario = Scenario(args.latency, args.error_rate, args.error_status, args.body_rate, args.padding, args.stable)
+    server = MockServer(args.port, scenario, verbose=True)
+    print(f"Serving {scenario} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
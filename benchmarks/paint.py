@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Offscreen paint-cost benchmark of the custom widgets
+
+Renders every widget at realistic sizes in light and dark theme N times with QWidget.render into a QImage
+and reports ns/paint, the transient Python allocation peak of a paint and net allocated blocks per paint.
+Every device pixel ratio runs in its own process with QT_SCALE_FACTOR set, e.g.
+
+    python benchmarks/paint.py --runs 500 --dpr 1 --dpr 2
+    python benchmarks/paint.py --save-baseline
+    python benchmarks/paint.py --tolerance 0.25
+
+Results are compared against benchmarks/paint_baseline.json and the run fails when a case gets slower than its
+baseline by more than the tolerance, or when there is no baseline yet and --save-baseline is not given.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paint_baseline.json")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def _targetImage(widget):
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QImage
+
+    dpr = widget.devicePixelRatioF()
+    image = QImage(widget.size() * dpr, QImage.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(dpr)
+    image.fill(Qt.transparent)
+    widget.render(image)
+    return image
+
+
+def measurePaint(widget, runs: int, step=None) -> float:
+    """ average nanoseconds per paint of `widget` rendered into a QImage, `step(i)` runs before every paint """
+    image = _targetImage(widget)
+
+    start = time.perf_counter_ns()
+    for i in range(runs):
+        if step:
+            step(i)
+        widget.render(image)
+
+    return (time.perf_counter_ns() - start) / runs
+
+
+def measureAllocations(widget, runs: int, step=None):
+    """ peak traced bytes of a single paint and net allocated blocks per paint """
+    image = _targetImage(widget)
+
+    tracemalloc.start()
+    peak = 0
+    blocks = sys.getallocatedblocks()
+    for i in range(runs):
+        if step:
+            step(i)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        widget.render(image)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+
+    blocks = (sys.getallocatedblocks() - blocks) / runs
+    tracemalloc.stop()
+    return peak, blocks
+
+
+def cardCases(NeonMain):
+    def card(style, isCached=True):
+        def factory():
+            w = NeonMain.CardWidget()
+            if not isCached:
+                w.chromeCacheSize = 0
+            w.setFixedSize(200, 200)
+            w.setBorderRadius(18)
+            if style == "weather":
+                w.setWeatherStyle("2f2cbc", "4bb4f0")
+            elif style == "motto":
+                w.setMottoStyle()
+            elif style == "countdown":
+                w.setCountdownStyle()
+            return w, None
+
+        return factory
+
+    for style in ("normal", "weather", "motto", "countdown"):
+        yield f"CardWidget[{style}]", card(style)
+        yield f"CardWidget[{style},uncached]", card(style, False)
+
+
+def imageCases(NeonMain):
+    from PyQt5.QtCore import QSize
+    from PyQt5.QtGui import QImage, QColor
+
+    def frames(n):
+        images = []
+        for i in range(n):
+            image = QImage(240, 240, QImage.Format_ARGB32_Premultiplied)
+            image.fill(QColor.fromHsv(i * 360 // n, 200, 200))
+            images.append(image)
+        return images
+
+    def static():
+        w = NeonMain.ImageLabel(frames(1)[0])
+        w.setBorderRadius(8, 8, 8, 8)
+        w.setFixedSize(120, 120)
+        return w, None
+
+    def animated():
+        w = NeonMain.ImageLabel(frames(1)[0])
+        w.setBorderRadius(8, 8, 8, 8)
+        w.setFixedSize(120, 120)
+        images = frames(12)
+
+        def step(i):
+            w.image = images[i % len(images)]
+
+        return w, step
+
+    def skycon():
+        w = NeonMain.ImageLabel()
+        w.setImage(NeonMain.SkyconAtlas.image("CLEAR_DAY", QSize(48, 48), w.devicePixelRatioF()))
+        w.setFixedSize(48, 48)
+        return w, None
+
+    yield "ImageLabel[static]", static
+    yield "ImageLabel[animated]", animated
+    yield "ImageLabel[skycon]", skycon
+
+
+def buttonCases(NeonMain):
+    def button(isToggled=False):
+        def factory():
+            w = NeonMain.CurriculumButton()
+            w.setDualText("数学", "  第三节")
+            w.setTextColor("#0179D4")
+            w.setFixedSize(150, 48)
+            if not isToggled:
+                return w, None
+
+            def step(i):
+                w.setDown(i % 2 == 0)
+
+            return w, step
+
+        return factory
+
+    yield "CurriculumButton[dual]", button()
+    yield "CurriculumButton[dual,pressed]", button(True)
+
+
+def pagerCases(NeonMain):
+    def pager():
+        w = NeonMain.HorizontalPipsPager()
+        w.setPageNumber(3)
+        w.setVisibleNumber(3)
+
+        def step(i):
+            w.setCurrentIndex(i % 3)
+
+        return w, step
+
+    yield "HorizontalPipsPager[3]", pager
+
+
+def labelCases(NeonMain):
+    def label(cls, text, width):
+        def factory():
+            w = cls(text)
+            w.setWordWrap(True)
+            w.setFixedWidth(width)
+            w.adjustSize()
+            return w, None
+
+        return factory
+
+    yield "WeatherTitleLabel", label(NeonMain.WeatherTitleLabel, "23°", 100)
+    yield "WeatherContentLabel", label(NeonMain.WeatherContentLabel, "未来两小时不会下雨，放心出门吧", 178)
+    yield "MottoLabel", label(NeonMain.MottoLabel, "A journey of a thousand miles begins with a single step.", 178)
+    yield "CountdownEventLabel", label(NeonMain.CountdownEventLabel, "期末考试", 178)
+    yield "CountdownDisplayLabel", label(NeonMain.CountdownDisplayLabel, "42", 178)
+
+
+CASES = (cardCases, imageCases, buttonCases, pagerCases, labelCases)
+
+
+def runChild(runs: int):
+    """ measure every case in both themes at the DPR of this process """
+    os.chdir(tempfile.mkdtemp(prefix="neon-bench-"))
+
+    import NeonMain
+    from PyQt5.QtWidgets import QApplication
+    from qfluentwidgets import setTheme, Theme
+
+    app = QApplication(sys.argv)
+    dpr = app.devicePixelRatio()
+    results = {}
+    for theme in (Theme.LIGHT, Theme.DARK):
+        setTheme(theme)
+        for cases in CASES:
+            for name, factory in cases(NeonMain):
+                widget, step = factory()
+                ns = measurePaint(widget, runs, step)
+                peak, blocks = measureAllocations(widget, max(1, runs // 10), step)
+                results[f"{name}@{theme.value.lower()}@{dpr:g}x"] = {"ns": ns, "peak": peak, "blocks": blocks}
+                widget.deleteLater()
+
+    app.quit()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """ cases slower than their baseline by more than `tolerance` """
+    regressions = []
+    for key, result in results.items():
+        if key in baseline and result["ns"] > baseline[key]["ns"] * (1 + tolerance):
+            regressions.append((key, baseline[key]["ns"], result["ns"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neon paint-cost benchmark")
+    parser.add_argument("--runs", type=int, default=300, help="paints per case")
+    parser.add_argument("--dpr", type=float, action="append", help="device pixel ratios to run, default 1 and 2")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(runChild(args.runs)))
+        return 0
+
+    # without a baseline nothing can regress, fail before spending the runs
+    if not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run with --save-baseline to create one")
+        return 1
+
+    results = {}
+    for dpr in args.dpr or [1.0, 2.0]:
+        env = dict(os.environ, QT_SCALE_FACTOR=f"{dpr:g}", QT_QPA_PLATFORM="offscreen")
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "--runs", str(args.runs)],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        results.update(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'case':<52}{'ns/paint':>12}{'peak B':>10}{'blocks':>9}")
+    for key, result in results.items():
+        print(f"{key:<52}{result['ns']:>12.0f}{result['peak']:>10}{result['blocks']:>9.2f}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+
+    for key, before, after in regressions:
+        print(f"REGRESSION {key}: {before:.0f} -> {after:.0f} ns/paint (+{(after / before - 1) * 100:.0f}%)")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
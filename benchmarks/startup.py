@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Start-up benchmark of NeonMain
+
+Measures, in fresh interpreters started from a temporary working directory:
+
+* time-to-exit of `python NeonMain.py` with AutoRun disabled in the config
+* time-to-first-paint of `python NeonMain.py --force-start` under the offscreen platform, i.e. until the first
+  CardWidget.paintEvent returns
+
+against the bare interpreter start-up as a reference, e.g.
+
+    python benchmarks/startup.py --runs 10
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "NeonMain.py")
+
+# starts NeonMain and reports its first card paint on stdout
+FIRST_PAINT = f"""
+import sys
+sys.path.insert(0, {ROOT!r})
+sys.argv = [{MAIN!r}, "--force-start"]
+
+import NeonMain
+paintEvent = NeonMain.CardWidget.paintEvent
+
+def firstPaint(widget, e):
+    paintEvent(widget, e)
+    NeonMain.CardWidget.paintEvent = paintEvent
+    print("painted", flush=True)
+    NeonMain.QApplication.quit()
+
+NeonMain.CardWidget.paintEvent = firstPaint
+NeonMain.main()
+"""
+
+
+def workdir(isAutoRun: bool) -> str:
+    path = tempfile.mkdtemp(prefix="neon-bench-")
+    os.makedirs(os.path.join(path, "config"))
+    with open(os.path.join(path, "config", "config.json"), 'w', encoding='utf-8') as f:
+        json.dump({"MainWindow": {"AutoRun": isAutoRun}, "Network": {"Endpoints": ["http://127.0.0.1:9"]}}, f)
+    return path
+
+
+def timeProcess(args, cwd: str, until: str = None) -> float:
+    """ seconds until the process exits, or until it prints `until`, nan if it never does """
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    if until:
+        for line in process.stdout:
+            if line.strip() == until:
+                elapsed = time.perf_counter() - start
+                break
+        else:
+            elapsed = float("nan")
+        process.kill()
+    else:
+        process.communicate()
+        elapsed = time.perf_counter() - start
+
+    process.wait()
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Neon start-up benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="processes started per case, the median is reported")
+    args = parser.parse_args(argv)
+
+    cases = [
+        ("interpreter", [sys.executable, "-c", "pass"], workdir(False), None),
+        ("exit (AutoRun off)", [sys.executable, MAIN], workdir(False), None),
+        ("first paint", [sys.executable, "-c", FIRST_PAINT], workdir(True), "painted"),
+    ]
+
+    print(f"{'case':<22}{'median ms':>12}{'min ms':>10}")
+    for name, command, cwd, until in cases:
+        samples = sorted(timeProcess(command, cwd, until) * 1000 for _ in range(args.runs))
+        print(f"{name:<22}{samples[len(samples) // 2]:>12.1f}{samples[0]:>10.1f}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())